@@ -0,0 +1,79 @@
+"""
+ASR backend benchmark: real-time factor and peak RSS per backend and model size.
+
+Each (backend, model) pair runs in its own subprocess so that peak RSS is
+measured for that model alone. RTF = transcription wall time / audio length
+(lower is better; < 1.0 is faster than real time).
+
+    python bench_asr.py speech.wav [--backends whisper faster_whisper] [--models tiny base small medium]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import soundfile as sf
+
+import config
+
+def run_worker(backend_name, model_name, wav_path, repeats):
+    from handlers.asr_backends import create_asr_backend
+
+    data, samplerate = sf.read(wav_path, dtype="float32", always_2d=True)
+    if samplerate != config.SAMPLE_RATE:
+        raise SystemExit(f"Expected {config.SAMPLE_RATE} Hz audio, got {samplerate} Hz.")
+    audio = data.mean(axis=1)
+    duration = audio.size / samplerate
+
+    load_start = time.perf_counter()
+    backend = create_asr_backend(backend_name, model_name, compute_type=config.ASR_COMPUTE_TYPE,
+                                 cpu_threads=config.ASR_CPU_THREADS)
+    load_time = time.perf_counter() - load_start
+
+    backend.transcribe(audio, language="ja", task="transcribe") # Warm-up
+    timings = []
+    text = ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        text = backend.transcribe(audio, language="ja", task="transcribe")["text"]
+        timings.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "load_time": load_time,
+        "rtf": min(timings) / duration,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, # KiB on Linux
+        "text": text,
+    }, ensure_ascii=False))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="16 kHz WAV with speech")
+    parser.add_argument("--backends", nargs="+", default=["whisper", "faster_whisper"])
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small", "medium"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "MODEL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1], args.recording, args.repeats)
+        return
+
+    print(f"{'backend':16s} {'model':8s} {'load s':>7s} {'RTF':>6s} {'peak RSS MB':>12s}  text")
+    for backend_name in args.backends:
+        for model_name in args.models:
+            proc = subprocess.run(
+                [sys.executable, __file__, args.recording, "--repeats", str(args.repeats),
+                 "--worker", backend_name, model_name],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+                print(f"{backend_name:16s} {model_name:8s} error: {error}")
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{backend_name:16s} {model_name:8s} {result['load_time']:7.1f} {result['rtf']:6.2f} "
+                  f"{result['peak_rss_mb']:12.0f}  {result['text'][:40]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Capture path benchmark: the old queue + indata.copy() + np.concatenate path
+versus the preallocated ring/utterance buffers used by AudioHandler.
+
+No microphone is needed. A producer thread calls each path's callback with
+synthetic blocks at the real-time block rate, while a consumer thread runs
+the same silence detection the handler does.
+
+    python bench_capture.py [--seconds 10]
+"""
+import argparse
+import queue
+import threading
+import time
+import tracemalloc
+import numpy as np
+
+from utils.ring_buffer import RingBuffer
+from utils.utterance_buffer import UtteranceBuffer, block_rms
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 1024
+SILENCE_THRESHOLD = 0.02
+MAX_RECORD_DURATION = 30
+PRE_ROLL_SAMPLES = int(0.3 * SAMPLE_RATE)
+
+class LegacyCapture:
+    """The original capture path (per-block copy, queue, list, concatenate)."""
+    def __init__(self):
+        self.audio_queue = queue.Queue()
+        self.frames = []
+
+    def callback(self, indata):
+        self.audio_queue.put(indata.copy())
+
+    def consume(self):
+        try:
+            data = self.audio_queue.get(timeout=0.1)
+        except queue.Empty:
+            return
+        self.frames.append(data)
+        np.sqrt(np.mean(data**2))
+
+    def finish(self):
+        return np.concatenate(self.frames, axis=0) if self.frames else None
+
+class PreallocatedCapture:
+    """The ring buffer + preallocated utterance path."""
+    def __init__(self):
+        self.ring_buffer = RingBuffer(PRE_ROLL_SAMPLES + SAMPLE_RATE)
+        self.utterance = UtteranceBuffer(MAX_RECORD_DURATION * SAMPLE_RATE + PRE_ROLL_SAMPLES)
+        self.utterance.fill_from_ring(self.ring_buffer, -PRE_ROLL_SAMPLES, 0)
+        self.data_event = threading.Event()
+        self.consumed = 0
+
+    def callback(self, indata):
+        self.utterance.append(indata)
+        self.ring_buffer.write(indata)
+        self.data_event.set()
+
+    def consume(self):
+        if not self.data_event.wait(timeout=0.1):
+            return
+        self.data_event.clear()
+        end = self.utterance.length
+        while end - self.consumed >= CHUNK_SIZE:
+            block_rms(self.utterance.view(self.consumed, self.consumed + CHUNK_SIZE))
+            self.consumed += CHUNK_SIZE
+
+    def finish(self):
+        return self.utterance.view()
+
+def make_blocks(n_blocks):
+    rng = np.random.default_rng(0)
+    return [(rng.standard_normal((CHUNK_SIZE, 1)) * 0.05).astype(np.float32) for _ in range(n_blocks)]
+
+def measure_allocations(capture_cls, blocks):
+    """Runs callback+consume in lockstep and sums the bytes allocated per step."""
+    capture = capture_cls()
+    tracemalloc.start()
+    allocated = 0
+    steps_with_alloc = 0
+    for block in blocks:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        capture.callback(block)
+        capture.consume()
+        _, peak = tracemalloc.get_traced_memory()
+        if peak > current:
+            allocated += peak - current
+            steps_with_alloc += 1
+    capture.finish()
+    tracemalloc.stop()
+    audio_seconds = len(blocks) * CHUNK_SIZE / SAMPLE_RATE
+    return allocated / audio_seconds, steps_with_alloc / audio_seconds
+
+def measure_cpu(capture_cls, blocks):
+    """Feeds blocks at the real-time rate and reports process CPU usage."""
+    capture = capture_cls()
+    interval = CHUNK_SIZE / SAMPLE_RATE
+    done = threading.Event()
+
+    def producer():
+        next_time = time.perf_counter()
+        for block in blocks:
+            capture.callback(block)
+            next_time += interval
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+        done.set()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    thread = threading.Thread(target=producer)
+    thread.start()
+    while not done.is_set():
+        capture.consume()
+    thread.join()
+    capture.consume()
+    capture.finish()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return 100.0 * cpu / wall
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Seconds of audio to simulate")
+    args = parser.parse_args()
+
+    n_blocks = int(args.seconds * SAMPLE_RATE / CHUNK_SIZE)
+    blocks = make_blocks(n_blocks)
+    print(f"--- Capture benchmark ({args.seconds:.0f}s of audio, {n_blocks} blocks) ---")
+    for name, cls in (("legacy (queue+copy+concat)", LegacyCapture), ("preallocated ring/utterance", PreallocatedCapture)):
+        bytes_per_sec, alloc_steps_per_sec = measure_allocations(cls, blocks)
+        cpu_percent = measure_cpu(cls, blocks)
+        print(f"{name:30s} alloc: {bytes_per_sec / 1024:8.1f} KiB/s "
+              f"({alloc_steps_per_sec:5.1f} allocating blocks/s), CPU: {cpu_percent:5.2f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Long-term memory benchmark against a large conversation log.
+
+Adds --rows synthetic exchanges to a MemoryIndex one by one (as
+DatabaseHandler reports them), then times:
+  - add: per-exchange indexing, background compactions included,
+  - save / load of the .npz index,
+  - search: top-k over all exchanges for --queries prompts (the target is
+    well under 10 ms per query, so recall does not delay the reply),
+and checks that an exchange about a rare topic is found among the rest.
+Nothing is sent to Gemini and no database is needed.
+
+    python bench_memory_index.py [--rows 100000] [--queries 500] [--k 3]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from handlers.memory_index import MemoryIndex
+
+TOPICS = ["天気", "晩ごはん", "カレー", "ラーメン", "映画", "ゲーム", "旅行", "京都", "北海道", "猫", "犬",
+          "仕事", "会議", "締め切り", "誕生日", "プレゼント", "音楽", "ピアノ", "ギター", "本", "小説", "散歩",
+          "公園", "桜", "海", "山登り", "温泉", "コーヒー", "紅茶", "ケーキ", "野球", "サッカー", "風邪", "病院",
+          "引っ越し", "掃除", "洗濯", "買い物", "電車", "自転車", "雨", "雪", "夏休み", "お正月", "宿題", "試験"]
+VERBS = ["について話そう", "が好きです", "はどうだった？", "の予定を教えて", "を忘れないでね", "が楽しみです",
+         "はもう済んだ？", "のことを考えていました", "が気になります", "をおすすめしてほしい"]
+REPLIES = ["そうですね、ご主人", "小夜も気になります", "覚えておきますね", "それは楽しそうです",
+           "無理しないでくださいね", "また教えてください", "いいと思います", "一緒に考えましょう"]
+
+def exchange(rng):
+    topics = rng.sample(TOPICS, 2)
+    user_text = f"{topics[0]}{rng.choice(VERBS)}。{topics[1]}{rng.choice(VERBS)}"
+    sayo_text = "。".join(f"{rng.choice(REPLIES)}、{rng.choice(topics)}{rng.choice(VERBS)}"
+                         for _ in range(rng.randint(1, 4))) + "。"
+    return user_text, sayo_text
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic exchanges to index")
+    parser.add_argument("--queries", type=int, default=500, help="Searches to time")
+    parser.add_argument("--k", type=int, default=3, help="Exchanges returned per search")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "memory_index.npz")
+    try:
+        index = MemoryIndex(path)
+        needle_id = args.rows // 3
+        adds = []
+        start = time.perf_counter()
+        for log_id in range(1, args.rows + 1):
+            if log_id == needle_id:
+                user_text, sayo_text = "妹の名前はみずきです。来月の十日が誕生日なんだ", "みずきさんの誕生日、覚えておきますね。"
+            else:
+                user_text, sayo_text = exchange(rng)
+            t = time.perf_counter()
+            index.add(log_id, user_text, sayo_text)
+            adds.append(time.perf_counter() - t)
+        total = time.perf_counter() - start
+        print(f"--- {args.rows} exchanges indexed in {total:.1f}s ---")
+        print(f"add           : median {statistics.median(adds) * 1e3:.3f} ms, p99 {percentile(adds, 0.99) * 1e3:.3f} ms, "
+              f"max {max(adds) * 1e3:.1f} ms")
+
+        start = time.perf_counter()
+        index.close()
+        print(f"compact + save: {(time.perf_counter() - start) * 1e3:.0f} ms ({os.path.getsize(path) / 1e6:.1f} MB)")
+        start = time.perf_counter()
+        index = MemoryIndex(path)
+        print(f"load          : {(time.perf_counter() - start) * 1e3:.0f} ms ({index.size} exchanges)")
+
+        queries = [exchange(rng)[0] for _ in range(args.queries)]
+        times = []
+        for query in queries:
+            t = time.perf_counter()
+            index.search(query, args.k)
+            times.append(time.perf_counter() - t)
+        print(f"search top-{args.k}  : median {statistics.median(times) * 1e3:.2f} ms, "
+              f"p95 {percentile(times, 0.95) * 1e3:.2f} ms, max {max(times) * 1e3:.2f} ms")
+
+        # Newer exchanges that are not compacted yet are searched too
+        for log_id in range(args.rows + 1, args.rows + 501):
+            index.add(log_id, *exchange(rng))
+        times = []
+        for query in queries:
+            t = time.perf_counter()
+            index.search(query, args.k)
+            times.append(time.perf_counter() - t)
+        print(f"  +500 pending: median {statistics.median(times) * 1e3:.2f} ms, p95 {percentile(times, 0.95) * 1e3:.2f} ms")
+
+        hits = index.search("妹の誕生日っていつだっけ？", args.k)
+        found = "found" if hits and hits[0][0] == needle_id else "NOT found"
+        print(f"recall check  : exchange #{needle_id} {found} ({', '.join(f'#{i} {s:.2f}' for i, s in hits)})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Prompt-assembly benchmark against a large conversation log.
+
+Fills a copy of sayo_log.db (or a fresh database) with --rows synthetic
+turns, then times one conversation turn's database work both ways:
+  - per-call SQLite (the old path): connect, SELECT the last 5 turns
+    ORDER BY id DESC, reverse, build the text prompt; connect again to log
+    the reply,
+  - DatabaseHandler: the same prompt from the in-memory recent turns,
+    the reply logged on the open connection,
+  - ConversationMemory: the structured contents GeminiHandler sends
+    (every recent turn within GEMINI_HISTORY_TOKEN_BUDGET), same store.
+Nothing is sent to Gemini.
+
+    python bench_prompt_assembly.py [--rows 100000] [--turns 200] [--db sayo_log.db]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import config
+from handlers.database_handler import DatabaseHandler
+from handlers.conversation_memory import ConversationMemory
+
+def fill(db_path, rows, rng):
+    phrases = ["今日はいい天気だね", "晩ごはん何にしよう", "明日の予定を教えて", "缶詰を数えています",
+               "おつかれさまでした", "小夜は元気ですよ", "ゲームの話をしよう", "もう寝る時間です"]
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS conversation_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        user_text TEXT,
+        sayo_text TEXT
+    )
+    """)
+    batch = [("、".join(rng.choices(phrases, k=2)), "。".join(rng.choices(phrases, k=rng.randint(2, 6))) + "。")
+             for _ in range(rows)]
+    conn.executemany("INSERT INTO conversation_logs (user_text, sayo_text) VALUES (?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+def text_prompt(rows, prompt):
+    """The text prompt think_with_gemini builds from the last turns."""
+    history_text = "[Conversation History]\n"
+    for user_text, sayo_text in rows:
+        history_text += f"User: {user_text}\nSayo: {sayo_text}\n"
+    return f"{history_text}\n[System Info]\n現在時刻: 00時00分\n\n[User Input]\n{prompt}"
+
+def per_call_turn(db_path, prompt):
+    """The old path: a fresh connection to read the history and another to log."""
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT user_text, sayo_text FROM conversation_logs ORDER BY id DESC LIMIT ?", (5,)
+    ).fetchall()
+    conn.close()
+    full_prompt = text_prompt(rows[::-1], prompt)
+    assembled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO conversation_logs (user_text, sayo_text) VALUES (?, ?)", (prompt, full_prompt[:20]))
+    conn.commit()
+    conn.close()
+    return assembled, time.perf_counter() - start
+
+def in_memory_turn(db_handler, prompt):
+    """Same 5-turn text prompt, with the history read from memory."""
+    start = time.perf_counter()
+    full_prompt = text_prompt(db_handler.get_recent_conversations(limit=5), prompt)
+    assembled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    db_handler.log_conversation(prompt, full_prompt[:20])
+    return assembled, time.perf_counter() - start
+
+def memory_turn(memory, prompt):
+    """Structured contents for GeminiHandler: summary plus every recent turn within the token budget."""
+    start = time.perf_counter()
+    contents = memory.contents() + [{"role": "user", "parts": [prompt]}]
+    assembled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    memory.add_turn(prompt, contents[-1]["parts"][0][:20])
+    return assembled, time.perf_counter() - start
+
+def report(name, results):
+    assemble = sorted(r[0] for r in results)
+    write = sorted(r[1] for r in results)
+    p95 = assemble[int(len(assemble) * 0.95)]
+    print(f"{name:<28}: assemble median {statistics.median(assemble) * 1e3:7.3f} ms (p95 {p95 * 1e3:.3f}), "
+          f"log median {statistics.median(write) * 1e3:7.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic turns to add")
+    parser.add_argument("--turns", type=int, default=200, help="Turns to time")
+    parser.add_argument("--db", help="Existing database to copy first (it is not modified)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "bench.db")
+    try:
+        if args.db:
+            shutil.copyfile(args.db, db_path)
+        start = time.perf_counter()
+        fill(db_path, args.rows, rng)
+        size = os.path.getsize(db_path) / 1e6
+        print(f"--- {args.rows} rows added ({size:.1f} MB, {time.perf_counter() - start:.1f}s); timing {args.turns} turns ---")
+
+        report("per-call SQLite", [per_call_turn(db_path, f"質問{i}") for i in range(args.turns)])
+
+        start = time.perf_counter()
+        db_handler = DatabaseHandler(db_path, recent_turns=config.DB_RECENT_TURNS)
+        # No summarizer: old turns are dropped instead of sent to Gemini
+        memory = ConversationMemory(db_handler, recent_token_budget=config.GEMINI_HISTORY_TOKEN_BUDGET)
+        print(f"startup load                : {(time.perf_counter() - start) * 1e3:7.3f} ms")
+        report("in-memory, 5-turn prompt", [in_memory_turn(db_handler, f"質問{i}") for i in range(args.turns)])
+        report(f"ConversationMemory ({len(memory.contents()) // 2} turns)",
+               [memory_turn(memory, f"質問{i}") for i in range(args.turns)])
+        db_handler.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
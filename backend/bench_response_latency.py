@@ -0,0 +1,90 @@
+"""
+Time-to-first-audio benchmark for the reply path: Gemini + VOICEVOX.
+
+Compares the blocking path (wait for Gemini's full response, then stream
+its sentences through VOICEVOX) against token streaming (each sentence is
+sent to VOICEVOX as soon as Gemini has generated it). Nothing is played.
+The clock starts when the prompt is sent, i.e. at the end of the user's
+turn once ASR is done.
+
+    python bench_response_latency.py [--prompt "..."] [--repeats 3]
+    python bench_response_latency.py --simulate-llm 40 --stand-in 0.15
+
+--simulate-llm replays SAMPLE_RESPONSE at the given characters per second
+instead of calling Gemini (after a fixed time to first token); --stand-in
+uses a local stand-in VOICEVOX with the given per-request latency.
+"""
+import argparse
+import statistics
+import time
+
+import config
+from handlers.voicevox_handler import VoicevoxHandler
+from bench_tts_latency import SAMPLE_RESPONSE
+from bench_voicevox_client import start_stand_in_server
+
+class SimulatedGemini:
+    """Replays a fixed response in small deltas at a steady generation rate."""
+    def __init__(self, text, chars_per_second, first_token_delay=0.4, delta_chars=6):
+        self.text = text
+        self.chars_per_second = chars_per_second
+        self.first_token_delay = first_token_delay
+        self.delta_chars = delta_chars
+
+    def think(self, prompt, stream=False):
+        if stream:
+            return self.think_stream(prompt)
+        return "".join(self.think_stream(prompt))
+
+    def think_stream(self, prompt):
+        time.sleep(self.first_token_delay)
+        for start in range(0, len(self.text), self.delta_chars):
+            delta = self.text[start:start + self.delta_chars]
+            time.sleep(len(delta) / self.chars_per_second)
+            yield delta
+
+def first_audio(audio_stream, start):
+    """Seconds from `start` to the first audio chunk, and to the last."""
+    first = None
+    for _audio in audio_stream:
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompt", default="今日の晩ごはん、何がいいと思う？")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--url", default=config.VOICEVOX_URL)
+    parser.add_argument("--simulate-llm", type=float, metavar="CHARS_PER_S", help="Replay a fixed response instead of calling Gemini")
+    parser.add_argument("--stand-in", type=float, metavar="LATENCY", help="Use a local stand-in VOICEVOX engine")
+    args = parser.parse_args()
+
+    url = args.url
+    if args.stand_in is not None:
+        _server, url = start_stand_in_server(args.stand_in)
+    # No cache: every repeat pays for synthesis, as a new reply would
+    voicevox = VoicevoxHandler(base_url=url, speaker_id=config.SPEAKER_ID,
+                               max_parallel_synthesis=config.TTS_MAX_PARALLEL)
+    if args.simulate_llm:
+        gemini = SimulatedGemini(SAMPLE_RESPONSE, args.simulate_llm)
+    else:
+        from handlers.gemini_handler import GeminiHandler
+        gemini = GeminiHandler(config.GEMINI_API_KEY, config.GEMINI_MODEL_NAME, config.SYSTEM_INSTRUCTION)
+
+    blocking, streaming = [], []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        text = gemini.think(args.prompt)
+        blocking.append(first_audio(voicevox.synthesize_audio_stream(text), start))
+
+        start = time.perf_counter()
+        streaming.append(first_audio(voicevox.synthesize_text_stream(gemini.think(args.prompt, stream=True)), start))
+
+    print(f"--- Prompt to first audio (median of {args.repeats}) ---")
+    for name, results in (("wait for full response", blocking), ("token streaming", streaming)):
+        print(f"{name:<23}: {statistics.median(r[0] for r in results):6.3f}s "
+              f"(last sentence ready after {statistics.median(r[1] for r in results):.3f}s)")
+
+if __name__ == "__main__":
+    main()
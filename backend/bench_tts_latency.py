@@ -0,0 +1,65 @@
+"""
+Time-to-first-audio benchmark for VOICEVOX synthesis.
+
+Compares the whole-response path (one audio_query + synthesis for the full
+text) against sentence streaming (sentences synthesized concurrently, first
+one handed to playback as soon as it is ready). Nothing is played.
+
+    python bench_tts_latency.py [--url http://127.0.0.1:50021] [--repeats 3]
+    python bench_tts_latency.py --stand-in 0.05 --per-char 0.02
+
+--stand-in uses a local stand-in VOICEVOX engine (one request at a time,
+like a CPU-bound engine) with the given per-request latency, plus
+--per-char seconds per character of synthesized text.
+"""
+import argparse
+import statistics
+import time
+
+import config
+from handlers.voicevox_handler import VoicevoxHandler
+from bench_voicevox_client import start_stand_in_server
+
+SAMPLE_RESPONSE = (
+    "ご主人、おかえりなさい！今日はお仕事おつかれさまでした。"
+    "小夜は缶詰を数えながら、ご主人の帰りを待っていましたよ。"
+    "晩ごはんはもう決まりましたか？"
+    "もしまだでしたら、あったかいお鍋なんてどうでしょう。"
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=config.VOICEVOX_URL)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--text", default=SAMPLE_RESPONSE)
+    parser.add_argument("--stand-in", type=float, metavar="LATENCY", help="Use a local stand-in VOICEVOX engine")
+    parser.add_argument("--per-char", type=float, default=0.0, help="Stand-in synthesis time per character (s)")
+    args = parser.parse_args()
+
+    url = args.url
+    if args.stand_in is not None:
+        _server, url = start_stand_in_server(args.stand_in, capacity=1, per_char=args.per_char)
+    handler = VoicevoxHandler(base_url=url, speaker_id=config.SPEAKER_ID,
+                              max_parallel_synthesis=config.TTS_MAX_PARALLEL)
+
+    blocking_first, stream_first, stream_total = [], [], []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        handler.synthesize_audio(args.text)
+        blocking_first.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first = None
+        for _audio in handler.synthesize_audio_stream(args.text):
+            if first is None:
+                first = time.perf_counter() - start
+        stream_first.append(first)
+        stream_total.append(time.perf_counter() - start)
+
+    print(f"--- Time to first audio ({len(args.text)} chars, median of {args.repeats}) ---")
+    print(f"whole response      : {statistics.median(blocking_first):6.3f}s")
+    print(f"sentence streaming  : {statistics.median(stream_first):6.3f}s "
+          f"(all sentences ready after {statistics.median(stream_total):.3f}s)")
+
+if __name__ == "__main__":
+    main()
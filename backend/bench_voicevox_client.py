@@ -0,0 +1,193 @@
+"""
+Per-utterance HTTP overhead of the VOICEVOX client.
+
+Starts a local stand-in VOICEVOX server (audio_query/synthesis with a fixed
+artificial latency and a short silent WAV) and times one utterance
+(audio_query + synthesis) with:
+  - bare requests.post (a new connection per call, as the code used to do)
+  - VoicevoxClient (pooled keep-alive session)
+  - VoicevoxClient with several sentences in flight at once
+  - AsyncVoicevoxClient.synthesize_many (only if aiohttp is installed)
+Overhead = measured time minus the server's artificial latency.
+
+    python bench_voicevox_client.py [--latency-ms 5] [--utterances 200] [--sentences 4]
+    python bench_voicevox_client.py --url http://127.0.0.1:50021   # real engine, no overhead column
+"""
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+import config
+from handlers.voicevox_client import VoicevoxClient, AsyncVoicevoxClient
+
+SENTENCES = [
+    "ご主人、おかえりなさい！",
+    "今日はお仕事おつかれさまでした。",
+    "晩ごはんはもう決まりましたか？",
+    "あったかいお鍋なんてどうでしょう。",
+]
+
+def _silent_wav(duration=0.5, sample_rate=24000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\0\0" * int(duration * sample_rate))
+    return buffer.getvalue()
+
+def start_stand_in_server(latency, capacity=None, per_char=0.0):
+    """
+    Serves /version, /audio_query and /synthesis on a free local port, each
+    POST taking `latency` seconds (/synthesis `per_char` more per character
+    of text, like the real engine). With `capacity`, at most that many
+    requests are processed at once (like a CPU-bound engine); the rest wait.
+    """
+    wav_bytes = _silent_wav()
+    slots = threading.BoundedSemaphore(capacity) if capacity else None
+    audio_query = {"accent_phrases": [], "speedScale": 1.0, "pitchScale": 0.0, "intonationScale": 1.0,
+                   "volumeScale": 1.0, "outputSamplingRate": 24000, "outputStereo": False}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, like the real engine (uvicorn)
+        disable_nagle_algorithm = True # Headers and body go out as separate writes
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, body, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _down(self):
+            if not self.server.down:
+                return False
+            self.send_error(503) # Simulates a crashed/overloaded engine
+            return True
+
+        def do_GET(self):
+            if self._down():
+                return
+            self._reply(json.dumps("0.0.0-stand-in").encode(), "application/json")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            if self._down():
+                return
+            delay = latency
+            if per_char and self.path.startswith("/synthesis"):
+                delay += per_char * len(json.loads(body).get("kana", ""))
+            if slots:
+                with slots:
+                    time.sleep(delay)
+            else:
+                time.sleep(delay)
+            if self.path.startswith("/audio_query"):
+                text = parse_qs(urlparse(self.path).query).get("text", [""])[0]
+                self._reply(json.dumps(dict(audio_query, kana=text)).encode(), "application/json")
+            else:
+                self._reply(wav_bytes, "audio/wav")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.down = False # Set to True to make every request fail with 503
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def bare_synthesize(url, text, speaker):
+    response = requests.post(f"{url}/audio_query", params={"text": text, "speaker": speaker})
+    response.raise_for_status()
+    response = requests.post(f"{url}/synthesis", params={"speaker": speaker}, data=json.dumps(response.json()))
+    response.raise_for_status()
+    return response.content
+
+def time_calls(function, count):
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        function(i)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def report(label, timings, base_latency):
+    median = statistics.median(timings)
+    line = f"{label:<34}: {median * 1000:8.2f} ms"
+    if base_latency is not None:
+        line += f"   (overhead {(median - base_latency) * 1000:7.2f} ms)"
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Benchmark a real engine instead of the stand-in server")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Stand-in server delay per request")
+    parser.add_argument("--utterances", type=int, default=200)
+    parser.add_argument("--sentences", type=int, default=len(SENTENCES))
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url, base_latency = args.url, None
+    else:
+        latency = args.latency_ms / 1000
+        server, url = start_stand_in_server(latency)
+        base_latency = 2 * latency # audio_query + synthesis
+    speaker = config.SPEAKER_ID
+    sentences = (SENTENCES * args.sentences)[:args.sentences]
+    batches = max(1, args.utterances // len(sentences))
+
+    print(f"--- VOICEVOX per-utterance time ({url}, median of {args.utterances}) ---")
+    report("bare requests.post",
+           time_calls(lambda i: bare_synthesize(url, SENTENCES[i % len(SENTENCES)], speaker), args.utterances),
+           base_latency)
+
+    client = VoicevoxClient(url, pool_size=len(sentences))
+    client.synthesize(SENTENCES[0], speaker) # Open the first pooled connection
+    report("pooled keep-alive",
+           time_calls(lambda i: client.synthesize(SENTENCES[i % len(SENTENCES)], speaker), args.utterances),
+           base_latency)
+
+    print(f"--- {len(sentences)} sentences per response, median of {batches} responses ---")
+    with ThreadPoolExecutor(max_workers=len(sentences)) as executor:
+        report("bare, sequential",
+               time_calls(lambda _: [bare_synthesize(url, s, speaker) for s in sentences], batches),
+               base_latency * len(sentences) if base_latency else None)
+        report("pooled, all sentences in flight",
+               time_calls(lambda _: list(executor.map(lambda s: client.synthesize(s, speaker), sentences)), batches),
+               base_latency)
+    client.close()
+
+    try:
+        async_client = AsyncVoicevoxClient(url, pool_size=len(sentences))
+    except ImportError as e:
+        print(f"async client skipped: {e}")
+    else:
+        async def run_async():
+            async with async_client:
+                await async_client.synthesize_many(sentences, speaker)
+                timings = []
+                for _ in range(batches):
+                    start = time.perf_counter()
+                    await async_client.synthesize_many(sentences, speaker)
+                    timings.append(time.perf_counter() - start)
+                return timings
+        report("async, all sentences in flight", asyncio.run(run_async()), base_latency)
+
+    if server:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
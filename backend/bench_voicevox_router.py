@@ -0,0 +1,74 @@
+"""
+Load test for multi-engine VOICEVOX routing.
+
+Starts several local stand-in engines that each synthesize one request at
+a time (like a CPU-bound VOICEVOX) and pushes a burst of sentences through
+VoicevoxRouter from many threads, for 1..N engines. Reports throughput and
+how evenly the requests were spread. With --failover, one engine starts
+failing halfway through the run to show requests moving to the others.
+
+    python bench_voicevox_router.py [--engines 4] [--sentences 200] [--latency-ms 20] [--failover]
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from bench_voicevox_client import SENTENCES, start_stand_in_server
+from handlers.voicevox_router import VoicevoxRouter
+
+def run(urls, servers, args):
+    router = VoicevoxRouter(urls, connect_timeout=0.5, read_timeout=10.0,
+                            pool_size=args.concurrency, health_interval=0.5)
+    router.check_health()
+    router.start_health_checks()
+    failed = 0
+    lock = threading.Lock()
+
+    def synthesize(i):
+        nonlocal failed
+        try:
+            router.synthesize(SENTENCES[i % len(SENTENCES)], config.SPEAKER_ID)
+        except Exception:
+            with lock:
+                failed += 1
+        if args.failover and i == args.sentences // 2 and len(servers) > 1:
+            servers[0].down = True
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(synthesize, range(args.sentences)))
+    elapsed = time.perf_counter() - start
+    served = [engine.served for engine in router.engines]
+    router.close()
+    return args.sentences / elapsed, served, failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", type=int, default=4)
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Time one engine spends per request")
+    parser.add_argument("--concurrency", type=int, default=16, help="Sentences in flight at once")
+    parser.add_argument("--failover", action="store_true", help="Make the first engine fail halfway through")
+    args = parser.parse_args()
+
+    print(f"--- {args.sentences} sentences, {args.concurrency} in flight, "
+          f"{args.latency_ms:.0f} ms per request, one request at a time per engine ---")
+    baseline = None
+    engine_counts = sorted({1, 2, args.engines} | ({4} if args.engines >= 4 else set()))
+    for count in engine_counts:
+        servers, urls = [], []
+        for _ in range(count):
+            server, url = start_stand_in_server(args.latency_ms / 1000, capacity=1)
+            servers.append(server)
+            urls.append(url)
+        throughput, served, failed = run(urls, servers, args)
+        baseline = baseline or throughput
+        print(f"{count} engine(s): {throughput:7.1f} sentences/s  (x{throughput / baseline:.2f})  "
+              f"per engine {served}  failed {failed}")
+        for server in servers:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Wake word gate benchmark: CPU spent on an idle-room recording with and
+without the WakeWordDetector in front of full Whisper transcription.
+
+The recording is cut into clips of --clip seconds (one "utterance" each, as
+the VAD would hand them over in an always-listening deployment). For every
+clip the script measures the CPU time of the gate alone, and of full ASR.
+Gated CPU = gate on every clip + full ASR only on the clips where it fired.
+
+    python bench_wake_word.py idle_room.wav [--clip 5] [--method whisper_tiny]
+    python bench_wake_word.py --synthetic 60 --stand-in
+
+--synthetic generates an idle room instead (fan noise plus distant,
+unintelligible voices). --stand-in runs randomly initialized models with
+the real architectures, for machines that cannot download the weights:
+the CPU cost of a decode does not depend on the weights, but the numbers
+of decoded tokens do, so each model runs one greedy pass without
+temperature fallback.
+"""
+import argparse
+import time
+import numpy as np
+import soundfile as sf
+import torch
+import whisper
+from whisper.model import ModelDimensions, Whisper
+
+import config
+from handlers.wake_word_detector import WakeWordDetector
+
+# Architectures of the official checkpoints (whisper.load_model(name).dims)
+STAND_IN_DIMS = {
+    "tiny": (384, 6, 4),
+    "base": (512, 8, 6),
+    "small": (768, 12, 12),
+    "medium": (1024, 16, 24),
+}
+
+def stand_in_model(name, *args, **kwargs):
+    """A randomly initialized Whisper model with the architecture of `name`."""
+    state, heads, layers = STAND_IN_DIMS[name]
+    torch.manual_seed(0)
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=state, n_audio_head=heads,
+                           n_audio_layer=layers, n_vocab=51865, n_text_ctx=448, n_text_state=state,
+                           n_text_head=heads, n_text_layer=layers)
+    return Whisper(dims).eval()
+
+def idle_room(duration, sample_rate, rng):
+    """Fan noise plus several overlapping, muffled voices, as from a TV in the next room."""
+    n = int(duration * sample_rate)
+    t = np.arange(n) / sample_rate
+    audio = rng.standard_normal(n) * 0.003
+    for _ in range(4):
+        # Harmonics of a wandering pitch, gated at a syllable rate
+        pitch = rng.uniform(100, 250) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.2, 1.0) * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+        syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t + rng.uniform(0, 6)), 0, None)
+        audio += 0.01 * voice * syllables
+    return audio.astype(np.float32)
+
+def cpu_time(fn, *args):
+    start = time.process_time()
+    result = fn(*args)
+    return time.process_time() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", nargs="?", help="16 kHz WAV of an idle room (background chatter, TV, ...)")
+    parser.add_argument("--synthetic", type=float, metavar="SECONDS", help="Generate an idle room of this length instead")
+    parser.add_argument("--stand-in", action="store_true", help="Use random-weight models with the real architectures")
+    parser.add_argument("--clip", type=float, default=5.0, help="Clip length in seconds")
+    parser.add_argument("--method", default=config.WAKE_WORD_METHOD, choices=["whisper_tiny", "template"])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        samplerate = config.SAMPLE_RATE
+        audio = idle_room(args.synthetic, samplerate, np.random.default_rng(0))
+    elif args.recording:
+        data, samplerate = sf.read(args.recording, dtype="float32", always_2d=True)
+        if samplerate != config.SAMPLE_RATE:
+            raise SystemExit(f"Expected {config.SAMPLE_RATE} Hz audio, got {samplerate} Hz.")
+        audio = data.mean(axis=1)
+    else:
+        raise SystemExit("Give a recording or --synthetic SECONDS.")
+    asr_options = {"language": "ja", "task": "transcribe"}
+    if args.stand_in:
+        whisper.load_model = stand_in_model
+        asr_options["temperature"] = 0.0
+    clip_samples = int(args.clip * samplerate)
+    clips = [audio[i:i + clip_samples] for i in range(0, audio.size, clip_samples)]
+
+    print(f"Loading Whisper model: {config.WHISPER_MODEL_NAME}...")
+    full_model = whisper.load_model(config.WHISPER_MODEL_NAME)
+    detector = WakeWordDetector(
+        sample_rate=samplerate,
+        keywords=config.WAKE_WORDS,
+        method=args.method,
+        window_duration=config.WAKE_WORD_WINDOW,
+        tiny_model_name=config.WAKE_WORD_TINY_MODEL,
+        template_dir=config.WAKE_WORD_TEMPLATE_DIR,
+        template_threshold=config.WAKE_WORD_TEMPLATE_THRESHOLD
+    )
+
+    ungated_cpu = 0.0
+    gated_cpu = 0.0
+    fired = 0
+    for clip in clips:
+        asr_cpu, _ = cpu_time(lambda a: full_model.transcribe(a, **asr_options), np.ascontiguousarray(clip))
+        gate_cpu, detected = cpu_time(detector.detect, clip)
+        ungated_cpu += asr_cpu
+        gated_cpu += gate_cpu + (asr_cpu if detected else 0.0)
+        fired += int(detected)
+
+    duration = audio.size / samplerate
+    print(f"--- Wake word gate ({args.method}) on {duration:.0f}s, {len(clips)} clips"
+          f"{' (stand-in models)' if args.stand_in else ''} ---")
+    print(f"Gate fired on {fired}/{len(clips)} clips")
+    print(f"Full ASR on every clip : {ungated_cpu:8.2f} CPU-s ({100 * ungated_cpu / duration:5.1f}% of real time)")
+    print(f"Gate + ASR when fired  : {gated_cpu:8.2f} CPU-s ({100 * gated_cpu / duration:5.1f}% of real time)")
+    if ungated_cpu > 0:
+        print(f"CPU saved              : {100 * (1 - gated_cpu / ungated_cpu):5.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,45 @@ load_dotenv()
 # --- API Keys and URLs ---
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 VOICEVOX_URL = "http://127.0.0.1:50021"
+VOICEVOX_URLS = [VOICEVOX_URL] # 複数のエンジンを並べると、空いているエンジンに振り分ける（落ちたエンジンは自動で回避）
+VOICEVOX_HEALTH_INTERVAL = 10.0 # エンジンの死活確認の間隔（秒）
+VOICEVOX_CONNECT_TIMEOUT = 3.0 # VOICEVOXへの接続タイムアウト（秒）
+VOICEVOX_READ_TIMEOUT = 30.0 # 応答待ちタイムアウト（秒）。エンジンが固まっても会話ループを止めない
+TTS_STREAMING = True # True: 文ごとに合成し、できた文から順に再生する
+TTS_MAX_PARALLEL = 2 # 同時に合成する文の最大数（エンジンを増やしたらその数に合わせて増やす）
+TTS_CACHE_DIR = "tts_cache" # 合成済み音声のキャッシュ先 (None で無効)
+TTS_CACHE_MAX_MB = 200 # ディスクキャッシュの上限（古いものから削除）
+TTS_CACHE_MEMORY_ITEMS = 64 # メモリ上に保持する音声の数
+TTS_PRERENDER_PHRASES = ["小夜にご用ですか？"] # 起動時に合成しておく定型文 (時報は音声版で自動追加)
+SAVE_SYNTHESIZED_AUDIO = False # True: 合成音声をWAVにも保存する (デバッグ用)。通常はメモリ上で直接再生
+SYNTHESIZED_AUDIO_PREFIX = "output" # 保存先: output_0.wav, output_1.wav, ...
+PLAYBACK_SAMPLE_RATE = 24000 # 再生ストリームのサンプルレート（VOICEVOXの出力と同じなら変換不要）
+PLAYBACK_BLOCK_SIZE = 512 # 再生ブロック長（小さいほど停止が速い）
+BARGE_IN_ENABLED = False # True: 小夜が話している途中でも話しかけると止めて録音を始める
+BARGE_IN_RATIO = 1.0 # 再生音量(RMS)の何倍の声で割り込みとみなすか。スピーカーの音を拾う環境では大きめに
+ECHO_SUPPRESSION_ENABLED = True # True: マイクが拾った小夜自身の声（再生音と相関が高い区間）を認識前に捨てる
+ECHO_MAX_DELAY = 0.5 # 再生からマイク入力までの遅延の最大値（秒）
+ECHO_CORRELATION_THRESHOLD = 0.5 # 再生音との相関がこれ以上で、かつ
+ECHO_MAX_DOUBLE_TALK = 0.15 # エコーより大きな音（ご主人の声）がある時間の割合がこれ以下ならエコーとみなす
 
 # --- Model Configuration ---
 SPEAKER_ID = 46  # VOICEVOX: 小夜/Sayo
 WHISPER_MODEL_NAME = "small"
+ASR_BACKEND = "whisper" # "whisper": openai-whisper (PyTorch FP32), "faster_whisper": CTranslate2 int8 (要 pip install faster-whisper)
+ASR_COMPUTE_TYPE = "int8" # faster_whisper用: "int8", "int8_float32", "float32"
+ASR_CPU_THREADS = 0 # faster_whisper用: 0 = 自動
+
+# --- ASR Cascade ---
+ASR_CASCADE_ENABLED = False # True: まず小さいモデルで認識し、自信がないときだけWHISPER_MODEL_NAMEで再認識する
+ASR_CASCADE_GATE_MODEL = "tiny"
+ASR_CASCADE_MIN_AVG_LOGPROB = -0.5 # これ以上なら小さいモデルの結果を採用
+ASR_CASCADE_MAX_NO_SPEECH_PROB = 0.3 # 採用する結果のno_speech_probの上限
+ASR_CASCADE_REJECT_NO_SPEECH_PROB = 0.8 # これ以上なら音声なしとみなし再認識しない
 GEMINI_MODEL_NAME = "gemini-2.5-flash"
+GEMINI_HISTORY_TOKEN_BUDGET = 4000 # そのまま送る最近の会話のトークン数の上限（超えた分は古い順に要約へまとめる）
+GEMINI_SUMMARY_TOKEN_BUDGET = 500 # それより前の会話の要約の長さの目安（0 で要約せず忘れる）
+GEMINI_CONTEXT_CACHE_TTL = None # 秒。設定するとペルソナ(SYSTEM_INSTRUCTION)をサーバー側にキャッシュする（モデルの最小キャッシュサイズ未満なら自動で無効）
+GEMINI_STREAMING = True # True: Geminiの応答を生成途中から受け取り、文ができしだい合成する (TTS_STREAMING と併用)
 
 # --- Audio Configuration ---
 SAMPLE_RATE = 16000
@@ -21,9 +55,48 @@ SILENCE_DURATION = 1.0
 CHUNK_SIZE = 1024
 CHANNELS = 1
 MAX_RECORD_DURATION = 30
+TRIM_MARGIN = 0.2 # 認識前に前後の無音を削る際に残す余白（秒）
+SEGMENT_MAX_DURATION = 10.0 # 長い録音は無音区間でこの長さ以下に分割して認識する（秒）
+SEGMENT_MIN_PAUSE = 0.3 # 分割に使う無音区間の最小長（秒）
+ASR_PARALLEL_SEGMENTS = 2 # 分割した区間を並列に認識する数（faster_whisperのみ並列化）
+VAD_TYPE = "adaptive" # "energy": 固定閾値(SILENCE_THRESHOLD)のRMS判定, "adaptive": ノイズフロア追従型
+PRE_ROLL_DURATION = 0.3 # 話し始め検出より前に遡って録音に含める時間（秒）
+SAVE_RECORDED_AUDIO = False # True: 録音をWAVにも保存する (デバッグ用)
+RECORDED_AUDIO_PATH = "recorded_speech.wav"
+
+# --- Streaming Speech Recognition ---
+STREAMING_ASR = False # True: 話している最中から逐次文字起こしを行う
+STREAMING_ASR_STEP = 1.0 # 途中結果を更新する間隔（秒）
+STREAMING_ASR_MAX_WINDOW = 15.0 # 未確定部分の最大長（秒）
+
+# --- Recognition Rejection ---
+# 雑音やテレビ音声の誤認識をGemini/VOICEVOXに送る前に破棄する
+REJECTION_ENABLED = True
+REJECT_NO_SPEECH_PROB = 0.6 # no_speech_probがこれより高く、かつ
+REJECT_AVG_LOGPROB = -1.0   # avg_logprobがこれより低ければ「音声なし」
+REJECT_MIN_AVG_LOGPROB = -1.5 # avg_logprobがこれより低ければ常に破棄
+REJECT_COMPRESSION_RATIO = 2.4 # 同じ語の繰り返し（幻覚）を破棄
+
+# --- Wake Word ---
+WAKE_WORD_ENABLED = True # True: 未アクティブ時は軽量なウェイクワード判定を通ったときだけWhisperを動かす
+WAKE_WORD_METHOD = "whisper_tiny" # "whisper_tiny" or "template"
+WAKE_WORDS = ["さよ", "さよち", "サヨ", "小夜"]
+WAKE_WORD_WINDOW = 1.5 # 判定に使う話し始めからの長さ（秒）
+WAKE_WORD_TINY_MODEL = "tiny"
+WAKE_WORD_TEMPLATE_DIR = "wake_word_templates" # template方式: 「さよ」の録音WAVを置くディレクトリ
+WAKE_WORD_TEMPLATE_THRESHOLD = 12.0
+
+# --- Warm-up ---
+# 起動時にWhisperの試し認識・VOICEVOXの話者初期化・Geminiへの接続をバックグラウンドで済ませ、最初の会話から通常の速さで応答する
+WARMUP_ENABLED = True
 
 # --- Database ---
 DB_PATH = "sayo_log.db"
+DB_RECENT_TURNS = 200 # 起動時にメモリへ読み込み、以後メモリ上で保持する直近の会話数（履歴の読み出しでディスクを読まない）
+# 長期記憶: 過去の会話すべてを文字2-gramで索引し、話しかけられた内容に関連する昔のやり取りを思い出してGeminiに渡す
+MEMORY_INDEX_PATH = "sayo_memory_index.npz" # 索引の保存先（None で長期記憶を使わない）
+MEMORY_RECALL_TOP_K = 3 # 1回の応答で思い出す過去のやり取りの最大数
+MEMORY_RECALL_MIN_SCORE = 0.2 # これ未満の関連度（0〜1程度）のやり取りは思い出さない
 
 # --- Logging Mode ---
 IS_MAKER_MODE = False # True: 詳細な開発者ログを出力 (Maker Mode), False: ご主人と小夜の会話のみ出力 (Use Mode)
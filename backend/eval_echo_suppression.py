@@ -0,0 +1,122 @@
+"""
+Scripted open-speaker session for the self-echo suppressor.
+
+Plays synthetic "Sayo" speech through a simulated room (output/input
+latency, a reverberant impulse response, mic noise) and records:
+  - echo turns: only Sayo's voice reaches the mic,
+  - user turns: the user speaks while Sayo is silent,
+  - barge-in turns: the user speaks over Sayo.
+Each recording is segmented with the configured VAD exactly as
+AudioHandler does, and every segment is checked against the playback
+reference. Reports the ASR invocations avoided and any user speech lost.
+
+    python eval_echo_suppression.py [--turns 8] [--delay-ms 60] [--echo-gain 0.5] [--rt60 0.3]
+"""
+import argparse
+import numpy as np
+
+import config
+from handlers.echo_suppressor import EchoSuppressor
+from handlers.playback_engine import resample
+from handlers.vad import create_vad, find_speech_segments
+
+def synthetic_voice(duration, sample_rate, f0, rng):
+    """Pulse train with a wandering pitch, two formant-like resonances and syllable-rate envelope."""
+    n = int(duration * sample_rate)
+    t = np.arange(n) / sample_rate
+    pitch = f0 * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.5, 1.5) * t))
+    phase = np.cumsum(pitch / sample_rate)
+    pulses = (np.diff(np.floor(phase), prepend=0) > 0).astype(np.float32)
+    voice = pulses
+    for formant in (rng.uniform(500, 900), rng.uniform(1200, 2200)):
+        kernel_t = np.arange(int(0.01 * sample_rate)) / sample_rate
+        voice = np.convolve(voice, np.exp(-kernel_t * 400) * np.sin(2 * np.pi * formant * kernel_t))[:n]
+    envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t + rng.uniform(0, 6)), 0, None) ** 0.5
+    voice = voice * envelope
+    return (0.2 * voice / (np.max(np.abs(voice)) + 1e-9)).astype(np.float32)
+
+def room_response(sample_rate, rt60, rng):
+    length = int(rt60 * sample_rate)
+    decay = np.exp(-6.9 * np.arange(length) / length)
+    response = rng.standard_normal(length) * decay * 0.3
+    response[0] = 1.0
+    return response / np.sqrt(np.sum(response ** 2))
+
+def run_turn(kind, args, rng):
+    capture_rate, playback_rate = config.SAMPLE_RATE, config.PLAYBACK_SAMPLE_RATE
+    duration, lead = 4.0, 1.0 # Sayo (if any) starts speaking `lead` seconds before the user
+    suppressor = EchoSuppressor(capture_rate, playback_rate, max_delay=config.ECHO_MAX_DELAY,
+                                correlation_threshold=config.ECHO_CORRELATION_THRESHOLD,
+                                max_double_talk=config.ECHO_MAX_DOUBLE_TALK)
+
+    played = np.zeros(int((duration + lead) * playback_rate), dtype=np.float32)
+    if kind in ("echo", "barge_in"):
+        played[:int(duration * playback_rate)] = synthetic_voice(duration, playback_rate, rng.uniform(220, 300), rng)
+    # Feed the reference block by block, as the output callback would
+    block = config.PLAYBACK_BLOCK_SIZE
+    for start in range(0, len(played), block):
+        suppressor.add_output(played[start:start + block, None], timestamp=(start + block) / playback_rate)
+
+    # What the mic hears: delayed, reverberant echo + user + noise
+    mic_len = int((duration + lead) * capture_rate)
+    echo = resample(played[:, None], playback_rate, capture_rate)[:, 0]
+    echo = np.convolve(echo, room_response(capture_rate, args.rt60, rng))[:mic_len] * args.echo_gain
+    delay = int(args.delay_ms / 1000 * capture_rate)
+    mic = np.zeros(mic_len, dtype=np.float32)
+    mic[delay:] += echo[:mic_len - delay]
+    user_span = None
+    if kind in ("user", "barge_in"):
+        user = synthetic_voice(2.0, capture_rate, rng.uniform(100, 150), rng) * 1.5
+        user_start = int(lead * capture_rate)
+        mic[user_start:user_start + len(user)] += user
+        user_span = (user_start, user_start + len(user))
+    mic += rng.standard_normal(mic_len).astype(np.float32) * 0.002
+
+    vad = create_vad(config.VAD_TYPE, capture_rate, config.CHUNK_SIZE, config.SILENCE_THRESHOLD)
+    segments = find_speech_segments(
+        vad.process(mic), config.CHUNK_SIZE, mic.size,
+        margin_samples=int(config.TRIM_MARGIN * capture_rate),
+        min_pause_samples=int(config.SEGMENT_MIN_PAUSE * capture_rate),
+        max_segment_samples=int(config.SEGMENT_MAX_DURATION * capture_rate)
+    )
+    end_time = mic_len / capture_rate
+    results = []
+    for start, end in segments:
+        segment_end_time = end_time - (mic_len - end) / capture_rate
+        measurement = suppressor.measure(mic[start:end], segment_end_time)
+        has_user = user_span is not None and start < user_span[1] and end > user_span[0]
+        results.append((suppressor.is_echo(mic[start:end], segment_end_time), has_user, measurement))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=8, help="Turns of each kind")
+    parser.add_argument("--delay-ms", type=float, default=60.0, help="Output + input latency + acoustic path")
+    parser.add_argument("--echo-gain", type=float, default=0.5)
+    parser.add_argument("--rt60", type=float, default=0.3, help="Room reverberation time (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"--- Scripted session: {args.turns} turns each, delay {args.delay_ms:.0f} ms, "
+          f"echo gain {args.echo_gain}, RT60 {args.rt60}s, threshold {config.ECHO_CORRELATION_THRESHOLD}/{config.ECHO_MAX_DOUBLE_TALK} ---")
+    total_before = total_after = 0
+    for kind in ("echo", "user", "barge_in"):
+        before = after = lost = 0
+        correlations, double_talk = [], []
+        for _ in range(args.turns):
+            for dropped, has_user, measurement in run_turn(kind, args, rng):
+                before += 1
+                after += not dropped
+                lost += dropped and has_user
+                correlations.append(measurement.correlation)
+                double_talk.append(measurement.double_talk)
+        total_before += before
+        total_after += after
+        print(f"{kind:<9}: ASR calls {before:3d} -> {after:3d}, user segments dropped {lost}, "
+              f"median correlation {np.median(correlations) if correlations else 0:.2f}, "
+              f"double talk {np.median(double_talk) if double_talk else 0:.2f}")
+    print(f"ASR invocations avoided: {total_before - total_after} of {total_before}")
+
+if __name__ == "__main__":
+    main()
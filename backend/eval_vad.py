@@ -0,0 +1,83 @@
+"""
+Offline evaluation of the voice activity detectors on labelled WAV fixtures.
+
+Each fixture is a WAV file plus a JSON file with the same name listing the
+speech regions in seconds:
+
+    fixtures/kitchen_fan.wav
+    fixtures/kitchen_fan.json   {"speech": [[1.20, 2.85], [3.30, 4.90]]}
+
+The audio is streamed through each VAD in capture-sized blocks together with
+the same Endpointer AudioHandler uses. For every file the script reports:
+  - endpoint latency: detected end of speech minus the labelled end,
+  - false cut: the endpoint fired before the labelled end (speech was lost),
+  - no end: the endpoint never fired (the recording would run to MAX_RECORD_DURATION).
+
+    python eval_vad.py fixtures/ [--vad energy adaptive]
+"""
+import argparse
+import glob
+import json
+import os
+import numpy as np
+import soundfile as sf
+
+import config
+from handlers.vad import create_vad, Endpointer
+
+def evaluate_file(vad_name, audio, sample_rate, speech_regions, batch_blocks=4):
+    vad = create_vad(vad_name, sample_rate, config.CHUNK_SIZE, config.SILENCE_THRESHOLD)
+    endpointer = Endpointer(sample_rate, config.CHUNK_SIZE, config.SILENCE_DURATION, vad)
+    batch = config.CHUNK_SIZE * batch_blocks
+    for start in range(0, audio.size, batch):
+        if endpointer.feed(vad.process(audio[start:start + batch])):
+            break
+
+    true_end = max(end for _, end in speech_regions)
+    if endpointer.end_block is None:
+        return None, False
+    detected_end = (endpointer.end_block + 1) * config.CHUNK_SIZE / sample_rate
+    return detected_end - true_end, detected_end < true_end
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", help="Directory with *.wav fixtures and matching *.json labels")
+    parser.add_argument("--vad", nargs="+", default=["energy", "adaptive"])
+    args = parser.parse_args()
+
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(args.fixtures, "*.wav"))):
+        label_path = os.path.splitext(wav_path)[0] + ".json"
+        if not os.path.exists(label_path):
+            print(f"Skipping {wav_path}: no {label_path}")
+            continue
+        data, samplerate = sf.read(wav_path, dtype="float32", always_2d=True)
+        with open(label_path, encoding="utf-8") as f:
+            regions = json.load(f)["speech"]
+        fixtures.append((os.path.basename(wav_path), data.mean(axis=1), samplerate, regions))
+
+    if not fixtures:
+        raise SystemExit(f"No labelled fixtures found in {args.fixtures}.")
+
+    for vad_name in args.vad:
+        print(f"--- VAD: {vad_name} ---")
+        latencies = []
+        false_cuts = 0
+        no_end = 0
+        for name, audio, samplerate, regions in fixtures:
+            latency, false_cut = evaluate_file(vad_name, audio, samplerate, regions)
+            if latency is None:
+                no_end += 1
+                print(f"  {name:30s} no end detected")
+                continue
+            latencies.append(latency)
+            false_cuts += int(false_cut)
+            print(f"  {name:30s} endpoint latency {latency:6.2f}s{'  FALSE CUT' if false_cut else ''}")
+
+        if latencies:
+            print(f"  median latency {np.median(latencies):.2f}s, p90 {np.percentile(latencies, 90):.2f}s")
+        print(f"  false-cut rate {false_cuts}/{len(fixtures)} ({100 * false_cuts / len(fixtures):.0f}%), "
+              f"no end {no_end}/{len(fixtures)}")
+
+if __name__ == "__main__":
+    main()
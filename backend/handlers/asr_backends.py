@@ -0,0 +1,87 @@
+# backend/handlers/asr_backends.py
+
+import threading
+import whisper
+from utils.logging_config import log_message
+
+class WhisperBackend:
+    """Reference backend: openai-whisper on PyTorch (FP32 on CPU)."""
+    name = "whisper"
+    # Decoding installs kv-cache hooks on the shared model, so calls must not overlap
+    supports_concurrency = False
+
+    def __init__(self, model_name, **_):
+        log_message(f"Loading Whisper model: {model_name}...")
+        self.model = whisper.load_model(model_name)
+        self._lock = threading.Lock() # e.g. the start-up warm-up running into the first turn
+        log_message("Whisper model loaded.")
+
+    def transcribe(self, audio, **options):
+        """Same arguments and result dict as whisper.Whisper.transcribe."""
+        with self._lock:
+            return self.model.transcribe(audio, **options)
+
+class FasterWhisperBackend:
+    """
+    CTranslate2 backend (faster-whisper) with int8 quantized weights on CPU.
+    Results are converted to the openai-whisper result dict, so callers do
+    not need to know which backend is in use.
+    """
+    name = "faster_whisper"
+    supports_concurrency = True
+
+    def __init__(self, model_name, compute_type="int8", cpu_threads=0, num_workers=1, **_):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError(
+                "ASR_BACKEND='faster_whisper' requires the faster-whisper package "
+                "(pip install faster-whisper)."
+            ) from e
+        log_message(f"Loading faster-whisper model: {model_name} ({compute_type})...")
+        self.model = WhisperModel(model_name, device="cpu", compute_type=compute_type,
+                                  cpu_threads=cpu_threads, num_workers=num_workers)
+        log_message("faster-whisper model loaded.")
+
+    def transcribe(self, audio, language=None, task="transcribe", word_timestamps=False,
+                   initial_prompt=None, condition_on_previous_text=True, **_):
+        # openai-whisper's transcribe() decodes greedily by default; match it
+        segments, info = self.model.transcribe(
+            audio, language=language, task=task, beam_size=1,
+            word_timestamps=word_timestamps, initial_prompt=initial_prompt,
+            condition_on_previous_text=condition_on_previous_text
+        )
+        result_segments = []
+        for segment in segments:
+            result_segment = {
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+                "compression_ratio": segment.compression_ratio,
+                "temperature": segment.temperature,
+            }
+            if word_timestamps and segment.words:
+                result_segment["words"] = [
+                    {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+                    for word in segment.words
+                ]
+            result_segments.append(result_segment)
+        return {
+            "text": "".join(segment["text"] for segment in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+ASR_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+def create_asr_backend(name, model_name, **options):
+    """Builds the ASR backend selected in config (ASR_BACKEND)."""
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {name} (choose from {', '.join(ASR_BACKENDS)})")
+    return ASR_BACKENDS[name](model_name, **options)
@@ -0,0 +1,79 @@
+# backend/handlers/asr_cascade.py
+
+import re
+import threading
+from utils.logging_config import log_message
+
+_PUNCTUATION = re.compile(r"[\s、。，．,.!?！？…「」『』]+")
+
+class CascadeASR:
+    """
+    Two-tier ASR with the same transcribe() interface as the backends.
+
+    The small gate model transcribes every clip first. Its result is kept if
+      - it is confident: mean avg_logprob >= min_avg_logprob and
+        max no_speech_prob <= max_no_speech_prob,
+      - it is clearly not speech: no_speech_prob >= reject_no_speech_prob
+        and the text is empty or avg_logprob < min_avg_logprob, or
+      - the text is nothing but an accepted phrase (hotword or exit command).
+    Otherwise the large model re-decodes the clip. Per-tier hit counts are
+    logged on every call so the thresholds can be tuned.
+    """
+    def __init__(self, gate_backend, full_backend, accept_phrases=(), min_avg_logprob=-0.5,
+                 max_no_speech_prob=0.3, reject_no_speech_prob=0.8):
+        self.gate_backend = gate_backend
+        self.full_backend = full_backend
+        self.accept_phrases = {self._normalize(phrase) for phrase in accept_phrases}
+        self.min_avg_logprob = min_avg_logprob
+        self.max_no_speech_prob = max_no_speech_prob
+        self.reject_no_speech_prob = reject_no_speech_prob
+
+        self._lock = threading.Lock()
+        self.hits = {"gate": 0, "full": 0}
+
+    @property
+    def supports_concurrency(self):
+        return self.gate_backend.supports_concurrency and self.full_backend.supports_concurrency
+
+    @staticmethod
+    def _normalize(text):
+        return _PUNCTUATION.sub("", text).lower()
+
+    def _gate_decision(self, result):
+        """Returns the reason for keeping the gate result, or None to escalate."""
+        segments = result.get("segments", [])
+        text = self._normalize(result.get("text", ""))
+        if not segments:
+            # Nothing to judge the gate by; the small model may just have missed real speech
+            return None
+
+        no_speech_prob = max(segment.get("no_speech_prob", 0.0) for segment in segments)
+        avg_logprob = sum(segment.get("avg_logprob", 0.0) for segment in segments) / len(segments)
+        # Like Whisper's own rule: a high no_speech_prob only counts when the text is empty or unsure
+        if no_speech_prob >= self.reject_no_speech_prob and (not text or avg_logprob < self.min_avg_logprob):
+            return f"no speech ({no_speech_prob:.2f})"
+        if not text:
+            return None
+        if text in self.accept_phrases:
+            return "command"
+        if avg_logprob >= self.min_avg_logprob and no_speech_prob <= self.max_no_speech_prob:
+            return f"confident ({avg_logprob:.2f})"
+        return None
+
+    def transcribe(self, audio, **options):
+        result = self.gate_backend.transcribe(audio, **options)
+        reason = self._gate_decision(result)
+        tier = "gate"
+        if reason is None:
+            tier = "full"
+            result = self.full_backend.transcribe(audio, **options)
+
+        with self._lock:
+            self.hits[tier] += 1
+            total = self.hits["gate"] + self.hits["full"]
+            log_message(
+                f"ASR cascade: {tier} tier{f' [{reason}]' if reason else ''} "
+                f"(gate {self.hits['gate']}/{total} = {100 * self.hits['gate'] / total:.0f}%, "
+                f"full {self.hits['full']}/{total})"
+            )
+        return result
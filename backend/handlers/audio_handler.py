@@ -4,141 +4,521 @@ import whisper
 import sounddevice as sd
 import soundfile as sf
 import numpy as np
-import queue
 import sys
 import select
 import time
 import os
 import threading
+import copy
+from concurrent.futures import ThreadPoolExecutor
 from utils.logging_config import log_message
+from utils.ring_buffer import RingBuffer
+from utils.utterance_buffer import UtteranceBuffer, block_rms
+from utils.wav_decoder import PCMAudio
+from handlers.vad import EnergyVAD, Endpointer, find_speech_segments
+from handlers.streaming_transcriber import StreamingTranscriber
+from handlers.asr_backends import create_asr_backend
+from handlers.asr_cascade import CascadeASR
+from handlers.recognition_result import RecognitionResult
+from handlers.playback_engine import PlaybackEngine
+from handlers.echo_suppressor import EchoSuppressor
 
 class AudioHandler:
-    def __init__(self, whisper_model_name, sample_rate, channels, chunk_size, silence_threshold, silence_duration, max_record_duration):
-        self.whisper_model = self._load_whisper_model(whisper_model_name)
+    def __init__(self, whisper_model_name, sample_rate, channels, chunk_size, silence_threshold, silence_duration, max_record_duration, pre_roll_duration=0.3,
+                 streaming_asr=False, streaming_step_duration=1.0, streaming_max_window=15.0,
+                 wake_word_detector=None, vad=None, asr_backend="whisper", asr_compute_type="int8", asr_cpu_threads=0,
+                 cascade_gate_model_name=None, cascade_options=None,
+                 trim_margin=0.2, segment_max_duration=10.0, segment_min_pause=0.3, asr_parallel_segments=2,
+                 playback_sample_rate=24000, playback_block_size=512, barge_in=False, barge_in_ratio=1.0,
+                 echo_suppression=False, echo_max_delay=0.5, echo_correlation_threshold=0.5, echo_max_double_talk=0.15):
+        # Any backend from handlers.asr_backends; all return Whisper-style results
+        self.whisper_model = create_asr_backend(
+            asr_backend, whisper_model_name,
+            compute_type=asr_compute_type, cpu_threads=asr_cpu_threads, num_workers=asr_parallel_segments
+        )
+        if cascade_gate_model_name:
+            # A small model answers first; the large one only re-decodes unsure clips
+            gate_model = create_asr_backend(
+                asr_backend, cascade_gate_model_name,
+                compute_type=asr_compute_type, cpu_threads=asr_cpu_threads, num_workers=asr_parallel_segments
+            )
+            self.whisper_model = CascadeASR(gate_model, self.whisper_model, **(cascade_options or {}))
         self.sample_rate = sample_rate
         self.channels = channels
         self.chunk_size = chunk_size
         self.silence_threshold = silence_threshold
         self.silence_duration = silence_duration
         self.max_record_duration = max_record_duration
+        self.pre_roll_samples = int(pre_roll_duration * sample_rate)
+        # Pre-ASR trimming and segmentation
+        self.trim_margin_samples = int(trim_margin * sample_rate)
+        self.segment_max_samples = int(segment_max_duration * sample_rate)
+        self.segment_min_pause_samples = int(segment_min_pause * sample_rate)
+        self.asr_parallel_segments = asr_parallel_segments
+        self.streaming_asr = streaming_asr
+        self.streaming_step_duration = streaming_step_duration
+        self.streaming_max_window = streaming_max_window
+        self.wake_word_detector = wake_word_detector
+        self.wake_word_heard = None # Wake word check run while recording the current utterance (None: not run)
+        # Voice activity detector; defaults to the original fixed RMS threshold
+        self.vad = vad or EnergyVAD(sample_rate, chunk_size, threshold=silence_threshold)
+        self.endpointer = Endpointer(sample_rate, chunk_size, silence_duration, self.vad)
         
-        # Thread-safe queue for audio data
-        self.audio_queue = queue.Queue()
+        # Signals from the audio callback to the consumer. State changes are
+        # also written to a pipe so the consumer can select() on it together
+        # with stdin instead of polling.
         self.speaking_event = threading.Event()
+        self.utterance_ended_event = threading.Event()
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
 
-    def _load_whisper_model(self, model_name):
-        """Loads the specified Whisper model."""
-        log_message(f"Loading Whisper model: {model_name}...")
-        model = whisper.load_model(model_name)
-        log_message("Whisper model loaded.")
-        return model
+        # Always-on capture: one long-lived stream writing into a small ring
+        # buffer that always holds the most recent pre-roll.
+        ring_capacity = self.pre_roll_samples + sample_rate
+        self.ring_buffer = RingBuffer(ring_capacity, channels)
+        self.stream = None
+        self.is_listening = False
+
+        # Once speech starts, the callback writes straight into this buffer
+        self.utterance = UtteranceBuffer(int(max_record_duration * sample_rate) + self.pre_roll_samples, channels)
+
+        # Persistent output stream; play_audio queues onto it
+        self.player = PlaybackEngine(sample_rate=playback_sample_rate, channels=1, block_size=playback_block_size)
+        # Barge-in: speech louder than barge_in_ratio x Sayo's output level
+        # stops her and starts a new utterance. Without it, the mic is ignored
+        # while she speaks.
+        self.barge_in = barge_in
+        self.barge_in_ratio = barge_in_ratio
+        # Incremented on every speech onset, whether or not audio was playing: a reply
+        # still being generated or synthesized between sentences stops too.
+        # Speakers compare against it.
+        self.barge_in_count = 0
+
+        # Self-echo suppression: everything played is kept as a reference, and
+        # captured segments that match it are dropped before ASR
+        self.echo_suppressor = None
+        self.asr_calls_avoided = 0
+        self.utterance_end_time = 0.0 # time.monotonic() of the last captured utterance sample
+        self.speech_end_time = 0.0 # time.monotonic() at which the user stopped talking (before the silence wait)
+        if echo_suppression:
+            self.echo_suppressor = EchoSuppressor(
+                sample_rate, playback_sample_rate,
+                history_duration=max_record_duration + pre_roll_duration + 1.0,
+                max_delay=echo_max_delay, correlation_threshold=echo_correlation_threshold,
+                max_double_talk=echo_max_double_talk
+            )
+            self.player.output_listener = self.echo_suppressor.add_output
+
+    def start_stream(self):
+        """Opens the capture stream once; it stays open between turns."""
+        if self.stream is not None:
+            return
+        self.stream = sd.InputStream(samplerate=self.sample_rate, channels=self.channels,
+                                     dtype='float32', callback=self._audio_callback,
+                                     blocksize=self.chunk_size)
+        self.stream.start()
+        log_message("Audio capture stream started.")
+
+    def open_streams(self):
+        """Opens the capture and playback streams ahead of the first turn."""
+        self.start_stream()
+        self.player.start()
+
+    def warm_up(self):
+        """
+        Runs one dummy transcription on every ASR model (both tiers of a
+        cascade) and one wake word check, so the first turn does not pay
+        for graph and kernel initialization. Can run in the background: the
+        models serialize their own decoding, so a turn that starts early
+        just waits for it.
+        """
+        silence = np.zeros(self.sample_rate, dtype=np.float32)
+        if isinstance(self.whisper_model, CascadeASR):
+            models = [self.whisper_model.gate_backend, self.whisper_model.full_backend]
+        else:
+            models = [self.whisper_model]
+        for model in models:
+            model.transcribe(silence, language="ja", task="transcribe")
+        if self.wake_word_detector is not None:
+            self.wake_word_detector.warm_up()
+
+    def close(self):
+        """Stops and closes the capture and playback streams."""
+        self.player.close()
+        if self.stream is None:
+            return
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception as e:
+            log_message(f"Error closing audio stream: {e}")
+        self.stream = None
+        log_message("Audio capture stream closed.")
 
     def _audio_callback(self, indata, frames, time_info, status):
-        """Callback function for the audio stream."""
+        """
+        Callback function for the audio stream. Runs the VAD on every block
+        and decides start and end of speech right here, so the consumer is
+        woken up within the block that completed the decision.
+        """
         if status:
             log_message(f"[STDERR] {status}")
-        self.audio_queue.put(indata.copy())
-        
-        # Detect if speaking has started
-        if not self.speaking_event.is_set():
-            rms = np.sqrt(np.mean(indata**2))
-            if rms > self.silence_threshold:
+
+        if self.is_listening and not self.utterance_ended_event.is_set():
+            decisions = self.vad.process(self._mono_view(indata))
+            if self.speaking_event.is_set():
+                self.utterance.append(indata)
+                self.utterance_end_time = time.monotonic()
+                if self.endpointer.feed(decisions) or self.utterance.is_full():
+                    self.utterance_ended_event.set()
+                    self._wake_consumer()
+            elif decisions.any() and self._speech_over_playback(indata):
+                self.barge_in_count += 1
+                if self.player.is_playing:
+                    self.player.stop() # Output goes silent from the next block
+                    log_message("Barge-in: stopped playback.")
+                # Speech started: seed the utterance with the pre-roll from the ring
+                onset_pos = self.ring_buffer.write_pos
+                self.utterance.fill_from_ring(
+                    self.ring_buffer, onset_pos - self.pre_roll_samples, onset_pos)
+                self.utterance.append(indata)
+                self.utterance_end_time = time.monotonic()
+                self.endpointer.feed(decisions)
                 self.speaking_event.set()
+                self._wake_consumer()
                 log_message("話し始めました...")
 
-    def listen_and_record(self, output_filename="recorded_speech.wav"):
+        self.ring_buffer.write(indata)
+
+    def _speech_over_playback(self, block):
+        """
+        While Sayo is speaking (or her echo may still be in the air), only
+        speech clearly louder than her output counts as the user talking.
+        """
+        level = self.player.output_level()
+        if level == 0.0:
+            return True
+        if not self.barge_in:
+            return False
+        return block_rms(self._mono_view(block)) > self.barge_in_ratio * level
+
+    def _wake_consumer(self):
+        """Wakes the thread blocked in listen_and_record's select()."""
+        try:
+            os.write(self._wakeup_write, b"\0")
+        except BlockingIOError:
+            pass # Already has pending wake-ups
+
+    def _drain_wakeups(self):
+        try:
+            while os.read(self._wakeup_read, 64):
+                pass
+        except BlockingIOError:
+            pass
+
+    def listen_and_record(self, output_filename=None, transcriber=None, wake_word_gate=False):
         """
         Listens for speech, records it, and stops when silence is detected.
-        Returns the path to the recorded file, "EXIT" if 'exit' is typed, or None.
+        Returns the recording as a mono float32 NumPy array, "EXIT" if 'exit'
+        is typed, or None. If output_filename is given, the recording is also
+        written to that file (debug only; Whisper does not need it).
+        If a StreamingTranscriber is given, it is started as soon as speech
+        begins; with wake_word_gate, only once the wake word detector has
+        fired on the first seconds of the recording (see wake_word_heard).
         """
         log_message("話しかけてください... ('exit'と入力して終了)")
         
-        frames = []
+        self.start_stream()
         self.speaking_event.clear()
-        self.audio_queue.queue.clear() # Clear previous data
-        silence_start_time = None
+        self.utterance_ended_event.clear()
+        self.utterance.reset()
+        self.vad.reset()
+        self.endpointer.reset()
+        self._drain_wakeups()
+        self.wake_word_heard = None
+        transcriber_started = False
+        watch_stdin = True
+        self.is_listening = True
         
-        with sd.InputStream(samplerate=self.sample_rate, channels=self.channels, 
-                              dtype='float32', callback=self._audio_callback, 
-                              blocksize=self.chunk_size):
-            
+        try:
             start_time = time.time()
             while True:
-                # 1. Check for 'exit' command from stdin
-                if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
-                    line = sys.stdin.readline()
-                    if line and line.strip().lower() == 'exit':
-                        return "EXIT"
-
-                # 2. Check for recording timeout
-                if time.time() - start_time > self.max_record_duration:
-                    log_message("最大録音時間に達しました。")
+                # 1. End of speech is decided by the callback
+                if self.utterance_ended_event.is_set():
+                    if self.utterance.is_full():
+                        log_message("最大録音時間に達しました。")
+                    else:
+                        log_message("無音を検出しました。録音を終了します。")
                     break
 
-                try:
-                    # 3. Get audio data from queue
-                    data = self.audio_queue.get(timeout=1.0)
-                    frames.append(data)
-                    
-                    # 4. Silence detection logic
-                    if self.speaking_event.is_set():
-                        rms = np.sqrt(np.mean(data**2))
-                        if rms < self.silence_threshold:
-                            if silence_start_time is None:
-                                silence_start_time = time.time()
-                            elif time.time() - silence_start_time > self.silence_duration:
-                                log_message("無音を検出しました。録音を終了します。")
-                                break
+                waiting_for_wake_word = False
+                if self.speaking_event.is_set() and transcriber and not transcriber_started:
+                    if wake_word_gate and self.wake_word_heard is None:
+                        # Same window the detector would look at after recording
+                        window_end = self.wake_word_detector.window_samples
+                        if self.utterance.length >= window_end:
+                            self.wake_word_heard = self.wake_word_detector.detect(
+                                self._to_mono(self.utterance.view(0, window_end)))
                         else:
-                            silence_start_time = None # Reset timer
-                
-                except queue.Empty:
-                    # Handle cases where the queue is empty
-                    if self.speaking_event.is_set() and silence_start_time and (time.time() - silence_start_time > self.silence_duration):
-                        log_message("無音を検出しました。録音を終了します。")
-                        break
+                            waiting_for_wake_word = True
+                    if not wake_word_gate or self.wake_word_heard:
+                        transcriber.start(
+                            lambda start, end: self._to_mono(self.utterance.view(start, end)),
+                            lambda: self.utterance.length
+                        )
+                        transcriber_started = True
+
+                # 2. Sleep until the callback signals, stdin has input, or a timeout is due
+                elapsed = time.time() - start_time
+                if elapsed >= self.max_record_duration:
+                    log_message("最大録音時間に達しました。")
+                    break
+                if not self.speaking_event.is_set() and elapsed >= 10:
                     # Timeout if no speech is detected for a while
-                    elif not self.speaking_event.is_set() and (time.time() - start_time > 10):
-                        log_message("10秒間音声が検出されませんでした。")
-                        break
-                    continue
+                    log_message("10秒間音声が検出されませんでした。")
+                    break
+                deadline = self.max_record_duration if self.speaking_event.is_set() else min(10, self.max_record_duration)
+                timeout = deadline - elapsed
+                if waiting_for_wake_word:
+                    # Come back once the wake word window has been recorded
+                    missing = self.wake_word_detector.window_samples - self.utterance.length
+                    timeout = min(timeout, max(missing / self.sample_rate, 0.01))
+                watched = [self._wakeup_read, sys.stdin] if watch_stdin else [self._wakeup_read]
+                readable = select.select(watched, [], [], timeout)[0]
+
+                if self._wakeup_read in readable:
+                    self._drain_wakeups()
+
+                # 3. Check for 'exit' command from stdin
+                if sys.stdin in readable:
+                    line = sys.stdin.readline()
+                    if not line:
+                        watch_stdin = False # EOF; stop watching
+                    elif line.strip().lower() == 'exit':
+                        return "EXIT"
+        finally:
+            self.is_listening = False
+        # The recording ends SILENCE_DURATION after the speech; latency is measured from the speech
+        self.speech_end_time = self.utterance_end_time - self.endpointer.trailing_silence()
 
-        if not frames:
+        if not self.speaking_event.is_set():
             log_message("音声が録音されませんでした。")
             return None
 
-        # Save the recorded audio to a file
-        recorded_audio = np.concatenate(frames, axis=0)
-        sf.write(output_filename, recorded_audio, self.sample_rate)
-        log_message(f"音声を {output_filename} に保存しました。")
-        return output_filename
-
-    def recognize_speech(self, audio_path):
-        """Transcribes speech from an audio file using Whisper."""
-        if not audio_path or not os.path.exists(audio_path):
-            return ""
-            
-        log_message(f"Recognizing speech from {audio_path}...")
+        # Copy out once so the next turn can reuse the utterance buffer
+        recorded_audio = self._to_mono(self.utterance.view())
+        if output_filename:
+            sf.write(output_filename, recorded_audio, self.sample_rate)
+            log_message(f"音声を {output_filename} に保存しました。")
+        return recorded_audio
+
+    def _mono_view(self, frames):
+        """Mono samples of a (frames, channels) block; a view when already mono."""
+        if frames.shape[1] == 1:
+            return frames[:, 0]
+        return frames.mean(axis=1, dtype=np.float32)
+
+    def _to_mono(self, frames):
+        """Returns a contiguous 1-D float32 copy of a (frames, channels) block."""
+        if frames.shape[1] == 1:
+            return frames[:, 0].copy()
+        return frames.mean(axis=1, dtype=np.float32)
+
+    def listen_and_recognize(self, on_partial=None, output_filename=None, require_wake_word=False):
+        """
+        Records one utterance and returns a RecognitionResult, "EXIT", or None.
+        In streaming mode, partial hypotheses are passed to
+        on_partial(committed_text, tentative_text) while the user is talking.
+        With require_wake_word, the wake word detector screens the recording
+        first and an empty result is returned without running full ASR if it
+        does not fire. In streaming mode it screens the first seconds while
+        the user is still talking, and streaming starts once it fires.
+        """
+        gate = require_wake_word and self.wake_word_detector is not None
+        transcriber = None
+        if self.streaming_asr:
+            transcriber = StreamingTranscriber(
+                self.whisper_model, self.sample_rate,
+                step_duration=self.streaming_step_duration,
+                max_window_duration=self.streaming_max_window,
+                on_partial=on_partial
+            )
+
+        audio = self.listen_and_record(output_filename=output_filename, transcriber=transcriber, wake_word_gate=gate)
+        if audio is None or isinstance(audio, str):
+            if transcriber:
+                transcriber.stop()
+            return audio
+
+        wake_word_heard = self.wake_word_heard
+        segments = None # Computed once and shared by echo suppression and ASR
+        if self.echo_suppressor is not None:
+            asr_calls_avoided = self.asr_calls_avoided
+            segments = self._drop_echo(audio, self._segment_speech(audio))
+            if not segments:
+                if transcriber:
+                    transcriber.stop()
+                return RecognitionResult()
+            if self.asr_calls_avoided != asr_calls_avoided:
+                wake_word_heard = None # Echo was cut out of the audio the early check saw
+
+        if gate:
+            if wake_word_heard is None:
+                wake_word_heard = self.wake_word_detector.detect(audio)
+            if not wake_word_heard:
+                if transcriber:
+                    transcriber.stop()
+                log_message("Wake word not detected. Skipping full recognition.")
+                return RecognitionResult()
+
+        if transcriber:
+            try:
+                recognition = transcriber.finish(audio)
+                log_message(f"Recognized: {recognition.text} ({recognition.describe()})")
+                return recognition
+            except Exception as e:
+                log_message(f"Error during streaming recognition: {e}")
+        return self.recognize_speech(audio, segments)
+
+    def recognize_speech(self, audio, segments=None):
+        """
+        Transcribes speech using Whisper and returns a RecognitionResult with
+        the text and its no_speech_prob / avg_logprob / compression_ratio.
+        `audio` is either a float32 NumPy array at 16 kHz, which is decoded in
+        memory, or a path to an audio file, which Whisper decodes via ffmpeg.
+        `segments` are the speech ranges of an array, if already known.
+        """
+        if isinstance(audio, np.ndarray):
+            if audio.size == 0:
+                return RecognitionResult()
+            if self.sample_rate != whisper.audio.SAMPLE_RATE:
+                log_message(f"Whisper expects {whisper.audio.SAMPLE_RATE} Hz audio, got {self.sample_rate} Hz.")
+                return RecognitionResult()
+            log_message(f"Recognizing speech from {audio.size / self.sample_rate:.2f}s of in-memory audio...")
+        elif not audio or not os.path.exists(audio):
+            return RecognitionResult()
+        else:
+            log_message(f"Recognizing speech from {audio}...")
+
         try:
-            result = self.whisper_model.transcribe(audio_path, language="ja", task="transcribe")
-            text = result.get("text", "")
-            log_message(f"Recognized: {text}")
-            return text
+            if isinstance(audio, np.ndarray):
+                result = self._transcribe_segments(audio, segments)
+            else:
+                result = self.whisper_model.transcribe(audio, language="ja", task="transcribe")
+            recognition = RecognitionResult.from_whisper(result)
+            log_message(f"Recognized: {recognition.text} ({recognition.describe()})")
+            return recognition
         except Exception as e:
             log_message(f"Error during speech recognition: {e}")
-            return ""
+            return RecognitionResult()
 
-    def play_audio(self, audio_path):
-        """Plays an audio file using sounddevice."""
-        if not audio_path or not os.path.exists(audio_path):
-            log_message("再生する音声ファイルが見つかりません。")
-            return
-            
-        log_message(f"Playing audio from {audio_path}...")
+    def _segment_speech(self, audio):
+        """
+        Trims leading/trailing silence and splits long recordings at VAD
+        pauses. Returns a list of (start, end) sample ranges.
+        """
+        # Work on a copy so the live detector's state is left alone
+        vad = copy.copy(self.vad)
+        vad.reset()
+        decisions = vad.process(audio)
+        segments = find_speech_segments(
+            decisions, self.chunk_size, audio.size,
+            margin_samples=self.trim_margin_samples,
+            min_pause_samples=self.segment_min_pause_samples,
+            max_segment_samples=self.segment_max_samples
+        )
+        if not segments:
+            # The VAD may miss quiet speech; let Whisper see everything
+            return [(0, audio.size)]
+        return segments
+
+    def _drop_echo(self, audio, segments):
+        """
+        Silences the speech `segments` of `audio` that are Sayo's own voice
+        picked up by the mic, in place. Returns the segments that are left
+        (an empty list if none is, so ASR is skipped altogether).
+        """
+        echo = [
+            self.echo_suppressor.is_echo(audio[start:end], self.utterance_end_time - (audio.size - end) / self.sample_rate)
+            for start, end in segments
+        ]
+        if not any(echo):
+            return segments
+        self.asr_calls_avoided += sum(echo)
+        if all(echo):
+            log_message(f"Echo of own speech detected; skipping recognition ({self.asr_calls_avoided} ASR calls avoided so far).")
+            return []
+        for (start, end), is_echo in zip(segments, echo):
+            if is_echo:
+                audio[start:end] = 0.0
+        log_message(f"Dropped {sum(echo)} of {len(segments)} segment(s) as echo of own speech.")
+        return [segment for segment, is_echo in zip(segments, echo) if not is_echo]
+
+    def _transcribe_segments(self, audio, segments=None):
+        """
+        Transcribes the speech segments of `audio` (in parallel when the
+        backend allows it) and stitches them back into one Whisper-style result.
+        """
+        if segments is None:
+            segments = self._segment_speech(audio)
+        speech_samples = sum(end - start for start, end in segments)
+        log_message(f"Transcribing {len(segments)} segment(s), {speech_samples / self.sample_rate:.2f}s of "
+                    f"{audio.size / self.sample_rate:.2f}s recorded.")
+
+        def transcribe(segment):
+            start, end = segment
+            return self.whisper_model.transcribe(audio[start:end], language="ja", task="transcribe")
+
+        if len(segments) > 1 and self.asr_parallel_segments > 1 and self.whisper_model.supports_concurrency:
+            with ThreadPoolExecutor(max_workers=self.asr_parallel_segments) as executor:
+                results = list(executor.map(transcribe, segments))
+        else:
+            results = [transcribe(segment) for segment in segments]
+
+        combined_segments = []
+        for (start, _), result in zip(segments, results):
+            offset = start / self.sample_rate
+            for segment in result.get("segments", []):
+                segment = dict(segment)
+                segment["start"] = segment.get("start", 0.0) + offset
+                segment["end"] = segment.get("end", 0.0) + offset
+                combined_segments.append(segment)
+        return {
+            "text": "".join(result.get("text", "") for result in results),
+            "segments": combined_segments,
+        }
+
+    def play_audio(self, audio, block=True, on_complete=None):
+        """
+        Plays a PCMAudio buffer (or an audio file path) on the playback
+        engine. With block=False it only queues the audio and returns, so
+        consecutive calls play back to back without gaps.
+        """
+        if not isinstance(audio, PCMAudio):
+            if not audio or not os.path.exists(audio):
+                log_message("再生する音声ファイルが見つかりません。")
+                return
+            try:
+                data, samplerate = sf.read(audio, dtype="float32")
+            except Exception as e:
+                log_message(f"Error reading audio: {e}")
+                return
+            audio = PCMAudio(data, samplerate)
         try:
-            data, samplerate = sf.read(audio_path)
-            sd.play(data, samplerate)
-            sd.wait()
-            log_message("Audio playback finished.")
+            self.player.enqueue(audio, on_complete=on_complete)
+            log_message(f"Queued {audio.duration:.1f}s of audio for playback.")
+            if block:
+                self.wait_playback()
         except Exception as e:
             log_message(f"Error playing audio: {e}")
+
+    def wait_playback(self):
+        """Blocks until everything queued has been played."""
+        self.player.wait()
+        log_message("Audio playback finished.")
+
+    def stop_playback(self):
+        """Cuts off the current speech and drops anything still queued."""
+        if self.player.stop():
+            log_message("Audio playback stopped.")
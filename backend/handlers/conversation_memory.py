@@ -0,0 +1,167 @@
+# backend/handlers/conversation_memory.py
+
+import threading
+from utils.logging_config import log_message
+from utils.tokens import estimate_tokens
+from handlers.memory_index import MemoryIndex
+
+class ConversationMemory:
+    """
+    What Sayo remembers of the conversation, bounded by tokens, not turns.
+
+    The newest turns are kept verbatim up to `recent_token_budget`. Once
+    they exceed it, the oldest ones are folded into a running summary by
+    `summarize(previous_summary, turns, max_tokens)` on a background thread, so the
+    reply never waits for it. Turns are logged to conversation_logs as
+    they are added. The summary is stored next to them in
+    conversation_summary, together with the last log id it covers, so a
+    restart picks up the summary plus the turns logged after it.
+
+    With a MemoryIndex, `contents(prompt)` also recalls up to `recall_k`
+    older exchanges related to the prompt (score >= recall_min_score), so
+    Sayo can remember things from long ago without a longer history.
+    """
+    def __init__(self, db_handler, summarize=None, recent_token_budget=2000, summary_token_budget=500,
+                 index=None, recall_k=3, recall_min_score=0.2):
+        self.db_handler = db_handler
+        self.index = index
+        self.recall_k = recall_k
+        self.recall_min_score = recall_min_score
+        self.summarize = summarize # None: old turns are simply forgotten
+        self.recent_token_budget = recent_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.turns = [] # (log_id, user_text, sayo_text, tokens), oldest first
+        self._lock = threading.Lock()
+        self._folding = False
+        self.summary, self.summarized_id = db_handler.load_summary()
+        # More rows than fit are not loaded: a huge backlog is not worth summarizing at startup
+        rows = db_handler.get_conversations_after(self.summarized_id, limit=max(1, recent_token_budget // 20))
+        for log_id, user_text, sayo_text in rows:
+            self.turns.append((log_id, user_text or "", sayo_text or "", self._tokens(user_text, sayo_text)))
+        log_message(f"Conversation memory: {len(self.turns)} recent turn(s), "
+                    f"summary of {estimate_tokens(self.summary)} tokens.")
+        self._fold_if_needed()
+
+    @staticmethod
+    def _tokens(user_text, sayo_text):
+        return estimate_tokens(user_text or "") + estimate_tokens(sayo_text or "")
+
+    def add_turn(self, user_text, sayo_text):
+        """Logs one exchange to the database and remembers it."""
+        log_id = self.db_handler.log_conversation(user_text, sayo_text)
+        with self._lock:
+            self.turns.append((log_id, user_text, sayo_text, self._tokens(user_text, sayo_text)))
+        self._fold_if_needed()
+
+    def contents(self, prompt=None):
+        """
+        Gemini contents for the next request: the summary (if any), past
+        exchanges related to `prompt` (with an index), then the newest turns
+        that fit into recent_token_budget. Turns waiting to be folded are
+        left out, so the size stays bounded even while the summary is being
+        regenerated.
+        """
+        with self._lock:
+            summary = self.summary
+            recent = []
+            total = 0
+            oldest_id = None
+            for log_id, user_text, sayo_text, tokens in reversed(self.turns):
+                if recent and total + tokens > self.recent_token_budget:
+                    break
+                recent.append((user_text, sayo_text))
+                total += tokens
+                oldest_id = log_id if log_id is not None else oldest_id
+        contents = []
+        if summary:
+            contents.append({"role": "user", "parts": [f"（これまでの会話の要約）\n{summary}"]})
+            contents.append({"role": "model", "parts": ["はい、覚えています。"]})
+        recalled = self._recall(prompt, oldest_id) if self.index is not None and prompt else []
+        if recalled:
+            transcript = "\n".join(f"ご主人: {user_text}\n小夜: {sayo_text}" for user_text, sayo_text in recalled)
+            contents.append({"role": "user", "parts": [f"（関連する過去の会話）\n{transcript}"]})
+            contents.append({"role": "model", "parts": ["はい、思い出しました。"]})
+        for user_text, sayo_text in reversed(recent):
+            contents.append({"role": "user", "parts": [user_text]})
+            contents.append({"role": "model", "parts": [sayo_text]})
+        return contents
+
+    def _recall(self, prompt, oldest_id):
+        """Related exchanges logged before `oldest_id` (those after it are in the prompt anyway)."""
+        max_log_id = oldest_id - 1 if oldest_id is not None else None
+        hits = [(log_id, score) for log_id, score in self.index.search(prompt, self.recall_k, max_log_id)
+                if score >= self.recall_min_score]
+        if not hits:
+            return []
+        rows = self.db_handler.get_conversations_by_ids(log_id for log_id, _ in hits)
+        log_message("Recalled past exchanges: " + ", ".join(f"#{log_id} ({score:.2f})" for log_id, score in hits))
+        # Oldest first, like the rest of the history
+        return [rows[log_id] for log_id in sorted(rows)]
+
+    def close(self):
+        """Saves the index (if any); call at shutdown, after the last turn is logged."""
+        if self.index is not None:
+            self.index.close()
+
+    def _fold_if_needed(self):
+        """Starts a background fold once the verbatim turns exceed the budget."""
+        with self._lock:
+            total = sum(turn[3] for turn in self.turns)
+            if self._folding or total <= self.recent_token_budget or len(self.turns) < 2:
+                return
+            # Fold down to half the budget, so the summary is not regenerated on every turn
+            fold = []
+            while len(self.turns) - len(fold) > 1 and total > self.recent_token_budget // 2:
+                turn = self.turns[len(fold)]
+                fold.append(turn)
+                total -= turn[3]
+            self._folding = True
+        threading.Thread(target=self._fold, args=(fold,), daemon=True).start()
+
+    def _fold(self, fold):
+        try:
+            summary = self.summary
+            if self.summarize is not None:
+                summary = self.summarize(self.summary, [(user_text, sayo_text) for _, user_text, sayo_text, _ in fold],
+                                         self.summary_token_budget)
+            last_id = max((turn[0] for turn in fold if turn[0] is not None), default=self.summarized_id)
+            with self._lock:
+                self.summary = summary
+                self.summarized_id = max(self.summarized_id, last_id)
+                del self.turns[:len(fold)]
+            self.db_handler.save_summary(summary, self.summarized_id)
+            log_message(f"Folded {len(fold)} turn(s) into the conversation summary "
+                        f"({estimate_tokens(summary)} tokens).")
+        except Exception as e:
+            # The turns stay verbatim (and out of the prompt once over budget); retried on the next turn
+            log_message(f"Error while summarizing the conversation: {e}")
+            return
+        finally:
+            with self._lock:
+                self._folding = False
+        self._fold_if_needed()
+
+def create_conversation_memory(db_handler, summarize=None, recent_token_budget=2000, summary_token_budget=500,
+                               index_path=None, recall_k=3, recall_min_score=0.2):
+    """
+    Builds the ConversationMemory the apps use. With `index_path`, a
+    MemoryIndex stored there is attached: every turn db_handler logs is
+    indexed as it happens, and rows logged before are caught up on a
+    background thread.
+    """
+    index = None
+    if index_path:
+        index = MemoryIndex(index_path)
+        # Rows up to here are caught up; later ones arrive through the listener
+        indexed_until = db_handler.latest_log_id()
+        db_handler.conversation_listener = index.add
+        threading.Thread(target=index.catch_up, args=(db_handler, indexed_until), daemon=True).start()
+    return ConversationMemory(
+        db_handler,
+        summarize=summarize,
+        recent_token_budget=recent_token_budget,
+        summary_token_budget=summary_token_budget,
+        index=index,
+        recall_k=recall_k,
+        recall_min_score=recall_min_score
+    )
@@ -1,18 +1,35 @@
 # backend/handlers/database_handler.py
 
 import sqlite3
+import threading
+from collections import deque
 from utils.logging_config import log_message
 
 class DatabaseHandler:
-    def __init__(self, db_path):
+    """
+    SQLite conversation log with the most recent rows mirrored in memory.
+
+    The newest `recent_turns` rows of conversation_logs are loaded once at
+    startup into a deque and every logged turn is appended to it, so reading
+    recent history never touches the disk; SQLite stays the durable store.
+    One connection is kept open (shared between threads under a lock)
+    instead of connecting for every call.
+    """
+    def __init__(self, db_path, recent_turns=200):
         self.db_path = db_path
+        self.recent = deque(maxlen=recent_turns) # (id, user_text, sayo_text), oldest first
+        self._has_older_rows = False # True once conversation_logs holds rows older than self.recent
+        self._lock = threading.Lock()
+        self.conn = None
+        # Called with (log_id, user_text, sayo_text) after every logged turn (e.g. MemoryIndex.add)
+        self.conversation_listener = None
         self._initialize_database()
 
     def _initialize_database(self):
-        """Initializes the SQLite database and table."""
+        """Initializes the SQLite database and tables and loads the recent rows."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            cursor = self.conn.cursor()
             cursor.execute("""
             CREATE TABLE IF NOT EXISTS conversation_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -21,27 +38,132 @@ class DatabaseHandler:
                 sayo_text TEXT
             )
             """)
-            conn.commit()
+            # Running summary of the turns older than the ones sent verbatim (single row)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_summary (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                summary TEXT,
+                last_log_id INTEGER,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """)
+            self.conn.commit()
+            rows = cursor.execute(
+                "SELECT id, user_text, sayo_text FROM conversation_logs ORDER BY id DESC LIMIT ?",
+                (self.recent.maxlen,)
+            ).fetchall()
+            self.recent.extend(reversed(rows))
+            self._has_older_rows = len(rows) == self.recent.maxlen
         except sqlite3.Error as e:
             log_message(f"Database error on initialization: {e}")
-        finally:
-            if conn:
-                conn.close()
-        log_message(f"Database initialized at {self.db_path}")
+        log_message(f"Database initialized at {self.db_path} ({len(self.recent)} recent turns in memory)")
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
 
     def log_conversation(self, user_text, sayo_text):
-        """Logs a single user-sayo interaction to the database."""
+        """Logs a single user-sayo interaction to the database. Returns the row id (None on error)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO conversation_logs (user_text, sayo_text) VALUES (?, ?)",
-                (user_text, sayo_text)
-            )
-            conn.commit()
+            with self._lock:
+                cursor = self.conn.execute(
+                    "INSERT INTO conversation_logs (user_text, sayo_text) VALUES (?, ?)",
+                    (user_text, sayo_text)
+                )
+                self.conn.commit()
+                if len(self.recent) == self.recent.maxlen:
+                    self._has_older_rows = True
+                self.recent.append((cursor.lastrowid, user_text, sayo_text))
+                if self.conversation_listener is not None:
+                    # Inside the lock, so listeners see rows in id order
+                    try:
+                        self.conversation_listener(cursor.lastrowid, user_text, sayo_text)
+                    except Exception as e:
+                        log_message(f"Error in conversation listener: {e}")
             log_message("Conversation logged.")
-        except sqlite3.Error as e:
+            return cursor.lastrowid
+        except (sqlite3.Error, AttributeError) as e:
             log_message(f"Database error on logging: {e}")
-        finally:
-            if conn:
-                conn.close()
+            return None
+
+    def latest_log_id(self):
+        """Id of the newest conversation_logs row (0 if there is none)."""
+        with self._lock:
+            return self.recent[-1][0] if self.recent else 0
+
+    def get_recent_conversations(self, limit=5):
+        """Returns the last `limit` (user_text, sayo_text) turns, oldest first, from memory."""
+        with self._lock:
+            rows = list(self.recent)[-limit:] if limit > 0 else []
+        return [(user_text, sayo_text) for _, user_text, sayo_text in rows]
+
+    def get_conversations_after(self, last_id, limit):
+        """
+        Returns up to `limit` (all if None) of the newest (id, user_text,
+        sayo_text) rows with id > last_id, oldest first. Served from memory
+        when the recent rows cover that range, from SQLite otherwise.
+        """
+        with self._lock:
+            if not self._has_older_rows or (self.recent and self.recent[0][0] <= last_id):
+                rows = [row for row in self.recent if row[0] > last_id]
+                if limit is not None:
+                    rows = rows[-limit:] if limit > 0 else []
+                return rows
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT id, user_text, sayo_text FROM conversation_logs WHERE id > ? ORDER BY id DESC LIMIT ?",
+                    (last_id, -1 if limit is None else limit)
+                ).fetchall()
+            return rows[::-1]
+        except (sqlite3.Error, AttributeError) as e:
+            log_message(f"Database error on reading conversations: {e}")
+            return []
+
+    def get_conversations_by_ids(self, log_ids):
+        """
+        Returns {id: (user_text, sayo_text)} for the given conversation_logs
+        ids. Ids among the recent rows are served from memory; only older
+        ones are read from SQLite.
+        """
+        log_ids = set(log_ids)
+        with self._lock:
+            found = {row[0]: (row[1], row[2]) for row in self.recent if row[0] in log_ids}
+        missing = [log_id for log_id in log_ids if log_id not in found]
+        if not missing:
+            return found
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT id, user_text, sayo_text FROM conversation_logs WHERE id IN ({','.join('?' * len(missing))})",
+                    missing
+                ).fetchall()
+            found.update((log_id, (user_text, sayo_text)) for log_id, user_text, sayo_text in rows)
+        except (sqlite3.Error, AttributeError) as e:
+            log_message(f"Database error on reading conversations: {e}")
+        return found
+
+    def load_summary(self):
+        """Returns (summary, last_log_id) of the conversation summary, or ("", 0) if there is none."""
+        try:
+            with self._lock:
+                row = self.conn.execute("SELECT summary, last_log_id FROM conversation_summary WHERE id = 1").fetchone()
+            return (row[0] or "", row[1] or 0) if row else ("", 0)
+        except (sqlite3.Error, AttributeError) as e:
+            log_message(f"Database error on reading the summary: {e}")
+            return ("", 0)
+
+    def save_summary(self, summary, last_log_id):
+        """Stores the summary covering every conversation_logs row up to last_log_id."""
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO conversation_summary (id, summary, last_log_id, updated_at) "
+                    "VALUES (1, ?, ?, CURRENT_TIMESTAMP)",
+                    (summary, last_log_id)
+                )
+                self.conn.commit()
+        except (sqlite3.Error, AttributeError) as e:
+            log_message(f"Database error on saving the summary: {e}")
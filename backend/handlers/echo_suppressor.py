@@ -0,0 +1,157 @@
+# backend/handlers/echo_suppressor.py
+
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+from utils.ring_buffer import RingBuffer
+from utils.audio_features import log_mel_spectrogram
+
+_N_MELS = 20
+_FRAME_DURATION = 0.032
+_HOP_DURATION = 0.010
+_ENERGY_FLOOR = 1e-6 # Band energy treated as silence
+_DOUBLE_TALK_EXCESS = np.log(10 ** 0.6) # Mic 6 dB above the predicted echo
+_REVERB_DECAY = np.log(10 ** 0.06) # 0.6 dB per 10 ms frame, i.e. RT60 up to 1 s
+
+# correlation: envelope match with the playback reference (0..1)
+# delay: estimated echo delay in seconds
+# double_talk: fraction of frames where something louder than the echo is present
+EchoMeasurement = namedtuple("EchoMeasurement", ["correlation", "delay", "double_talk"])
+
+class EchoSuppressor:
+    """
+    Recognizes Sayo's own voice coming back through the microphone.
+
+    The playback engine hands every output block to `add_output`, which
+    keeps the exact samples that were played (resampled to the capture
+    rate) in a ring buffer, stamped with the time they were produced. For a
+    captured speech segment, `is_echo` cross-correlates the microphone
+    signal's spectro-temporal envelope with that reference over every
+    plausible echo delay (output + input latency + the acoustic path, up to
+    `max_delay`). A segment that the delayed reference explains well
+    (correlation of at least `correlation_threshold`) with almost no frames
+    where the mic is louder than the predicted echo (at most
+    `max_double_talk`) is her echo and can be dropped before ASR.
+    """
+    def __init__(self, capture_rate, playback_rate, history_duration=35.0, max_delay=0.5,
+                 correlation_threshold=0.5, max_double_talk=0.15, min_reference_rms=1e-3):
+        self.capture_rate = capture_rate
+        self.playback_rate = playback_rate
+        self.max_delay_samples = int(max_delay * capture_rate)
+        self.correlation_threshold = correlation_threshold
+        self.max_double_talk = max_double_talk
+        self.min_reference_rms = min_reference_rms
+        self.reference = RingBuffer(int(history_duration * capture_rate) + self.max_delay_samples, 1)
+        self.reference_time = None # Time at which reference.write_pos was produced
+        self._lock = threading.Lock()
+        # Streaming resampler state: position of the next output sample, in
+        # input samples relative to the last sample of the previous block
+        self._step = playback_rate / capture_rate
+        self._phase = self._step
+        self._last_sample = 0.0
+
+    def add_output(self, block, timestamp=None):
+        """Records one played (frames, channels) block. Called from the output callback."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        samples = block.mean(axis=1) if block.ndim == 2 else block
+        n = len(samples)
+        if n == 0:
+            return
+        source = np.concatenate(([self._last_sample], samples))
+        positions = np.arange(self._phase, n + 1e-9, self._step)
+        resampled = np.interp(positions, np.arange(n + 1), source).astype(np.float32)
+        self._phase = (positions[-1] + self._step - n) if len(positions) else self._phase - n
+        self._last_sample = float(samples[-1])
+        with self._lock:
+            self.reference.write(resampled[:, None])
+            self.reference_time = timestamp
+
+    def _reference_for(self, start_time, length):
+        """Reference samples from `start_time` on (zeros where nothing was recorded)."""
+        out = np.zeros(length, dtype=np.float32)
+        with self._lock:
+            if self.reference_time is None:
+                return out
+            start_pos = self.reference.write_pos - int(round((self.reference_time - start_time) * self.capture_rate))
+            read_start = max(start_pos, self.reference.oldest_pos())
+            available = self.reference.read(read_start, start_pos + length)[:, 0]
+        offset = read_start - start_pos
+        out[offset:offset + available.size] = available
+        return out
+
+    def measure(self, samples, end_time):
+        """
+        Compares the spectro-temporal envelope (log mel bands, 10 ms frames)
+        of `samples` (mono, capture rate, last sample captured at
+        `end_time`) with that of the reference delayed by 0..max_delay.
+        Envelopes survive room reverberation far better than the raw
+        waveform does. At the best delay it also estimates the echo level
+        per band and counts the frames where the mic is well above it, i.e.
+        someone is talking over the echo. Returns an EchoMeasurement
+        (correlation is 0.0 if nothing audible was being played).
+        """
+        silent = EchoMeasurement(0.0, 0.0, 1.0)
+        length = len(samples)
+        if length < self.capture_rate * _HOP_DURATION * 4:
+            return silent
+        delay = self.max_delay_samples
+        start_time = end_time - (length + delay) / self.capture_rate
+        reference = self._reference_for(start_time, length + delay)
+        if np.sqrt(np.mean(np.square(reference))) < self.min_reference_rms:
+            return silent
+
+        mic_features = self._envelope(samples)
+        reference_features = self._envelope(reference)
+        frames = len(mic_features)
+        max_lag = len(reference_features) - frames
+        mic_centered = mic_features - mic_features.mean(axis=0)
+        mic_norm = np.sqrt(np.sum(mic_centered ** 2))
+        if mic_norm == 0.0 or max_lag < 0:
+            return silent
+
+        best, best_lag = 0.0, 0
+        for lag in range(max_lag + 1):
+            window = reference_features[lag:lag + frames]
+            window = window - window.mean(axis=0)
+            norm = np.sqrt(np.sum(window ** 2))
+            if norm == 0.0:
+                continue
+            correlation = float(np.sum(mic_centered * window) / (mic_norm * norm))
+            if correlation > best:
+                best, best_lag = correlation, lag
+
+        # Predict the echo envelope (reverb keeps each sound audible for a
+        # while), fit the echo path gain per band, then count the frames
+        # where the mic is far louder than the predicted echo
+        predicted = _hold_decay(reference_features)[best_lag:best_lag + frames]
+        mic_level = mic_features.mean(axis=1)
+        mic_active = mic_level > np.percentile(mic_level, 10) + _DOUBLE_TALK_EXCESS
+        fit = mic_active & (predicted.mean(axis=1) > np.log(_ENERGY_FLOOR) + _DOUBLE_TALK_EXCESS)
+        if not fit.any():
+            return EchoMeasurement(best, (max_lag - best_lag) * _HOP_DURATION, 1.0)
+        gain = np.median(mic_features[fit] - predicted[fit], axis=0)
+        # A different voice sticks out in some bands even when it is not much louder overall
+        excess = np.percentile(mic_features - (predicted + gain), 75, axis=1)
+        double_talk = float(np.mean(excess[mic_active] > _DOUBLE_TALK_EXCESS)) if mic_active.any() else 0.0
+        # Lag 0 is the earliest reference, i.e. the longest delay
+        return EchoMeasurement(best, (max_lag - best_lag) * _HOP_DURATION, double_talk)
+
+    def _envelope(self, samples):
+        """Log mel band energies, floored so silence does not dominate."""
+        features = log_mel_spectrogram(samples, self.capture_rate, n_mels=_N_MELS,
+                                       frame_duration=_FRAME_DURATION, hop_duration=_HOP_DURATION)
+        return np.maximum(features, np.log(_ENERGY_FLOOR))
+
+    def is_echo(self, samples, end_time):
+        """True if `samples` are Sayo's own voice and nobody is talking over it."""
+        measurement = self.measure(samples, end_time)
+        return (measurement.correlation >= self.correlation_threshold
+                and measurement.double_talk <= self.max_double_talk)
+
+def _hold_decay(features):
+    """Per-band peak hold that decays by _REVERB_DECAY per frame (log domain)."""
+    held = features.copy()
+    for i in range(1, len(held)):
+        np.maximum(held[i], held[i - 1] - _REVERB_DECAY, out=held[i])
+    return held
@@ -1,35 +1,142 @@
 # backend/handlers/gemini_handler.py
 
+import datetime
+import time
 import google.generativeai as genai
 from utils.logging_config import log_message
 
 class GeminiHandler:
-    def __init__(self, api_key, model_name, system_instruction):
+    """
+    One multi-turn chat with Gemini.
+
+    Earlier turns come from the ConversationMemory assigned to `memory`
+    and are sent as structured history (user/model contents) rather than
+    pasted into the prompt text; the caller records each exchange with
+    memory.add_turn. Without a memory every prompt is sent on its own.
+    With `context_cache_ttl`, the persona prompt is stored once as cached
+    content on the server and later turns only refer to it.
+    """
+    # Spoken when Gemini cannot be reached; a fixed phrase, so it is pre-rendered
+    ERROR_RESPONSE = "すみません、ご主人。少し考えごとをしていました。もう一度お願いできますか？"
+    SUMMARY_INSTRUCTION = (
+        "あなたは会話の記録係です。ご主人とAIアシスタント「小夜」の会話の要約を、"
+        "後で小夜が会話の続きをするための記憶として日本語で書きます。"
+        "ご主人について分かったこと（名前、好み、予定、約束など）と話題の流れを優先し、挨拶や相づちは省きます。"
+    )
+
+    def __init__(self, api_key, model_name, system_instruction, context_cache_ttl=None):
         if not api_key:
             raise ValueError("GEMINI_API_KEY must be provided.")
-        
+
         genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.memory = None # ConversationMemory providing the earlier turns
+        self.context_cache_ttl = context_cache_ttl
+        self.cached_content = None
+        self._cache_expires_at = 0.0
         self.model = genai.GenerativeModel(
             model_name,
             system_instruction=system_instruction
         )
+        if context_cache_ttl:
+            self._create_context_cache()
+        self._summary_model = genai.GenerativeModel(model_name, system_instruction=self.SUMMARY_INSTRUCTION)
         log_message("Gemini API configured.")
 
-    def think(self, prompt):
+    def _create_context_cache(self):
+        """Puts the persona prompt into a server-side context cache; falls back to sending it."""
+        try:
+            self.cached_content = genai.caching.CachedContent.create(
+                model=self.model_name,
+                system_instruction=self.system_instruction,
+                ttl=datetime.timedelta(seconds=self.context_cache_ttl)
+            )
+            self.model = genai.GenerativeModel.from_cached_content(self.cached_content)
+            self._cache_expires_at = time.monotonic() + self.context_cache_ttl
+            log_message(f"Persona prompt cached on the server ({self.cached_content.name}).")
+        except Exception as e:
+            # e.g. the prompt is below the model's minimum cacheable size
+            log_message(f"Context caching unavailable; sending the persona prompt with every turn: {e}")
+            self.cached_content = None
+
+    def _refresh_context_cache(self):
+        """Extends the cache's TTL shortly before it runs out."""
+        if self.cached_content is None or time.monotonic() < self._cache_expires_at - 60:
+            return
+        try:
+            self.cached_content.update(ttl=datetime.timedelta(seconds=self.context_cache_ttl))
+            self._cache_expires_at = time.monotonic() + self.context_cache_ttl
+        except Exception as e:
+            log_message(f"Could not extend the context cache ({e}); recreating it.")
+            self.model = genai.GenerativeModel(self.model_name, system_instruction=self.system_instruction)
+            self._create_context_cache()
+
+    def warm_up(self):
+        """
+        Opens the API connection with a count_tokens call (same service as
+        generate_content, but nothing is generated or billed as output).
+        """
+        self.model.count_tokens("こんにちは")
+
+    def summarize(self, previous_summary, turns, max_tokens):
+        """
+        Folds `turns` ((user_text, sayo_text) pairs) into `previous_summary`
+        and returns the new summary, written to stay within about
+        `max_tokens`. Raises on API errors.
+        """
+        transcript = "\n".join(f"ご主人: {user_text}\n小夜: {sayo_text}" for user_text, sayo_text in turns)
+        prompt = (
+            f"これまでの要約:\n{previous_summary or '（なし）'}\n\n"
+            f"その後の会話:\n{transcript}\n\n"
+            f"これまでの要約にその後の会話を統合した新しい要約を、{max_tokens}字以内で書いてください。"
+        )
+        return self._summary_model.generate_content(prompt).text.strip()
+
+    def think(self, prompt, stream=False):
         """
         Sends a prompt to the Gemini model and returns its response.
         Returns an empty string if the prompt is empty or only whitespace.
+        With stream=True, returns a generator of text deltas instead (see
+        think_stream); the blocking call simply joins them.
+        """
+        if stream:
+            return self.think_stream(prompt)
+        return "".join(self.think_stream(prompt))
+
+    def think_stream(self, prompt):
+        """
+        Yields the response text piece by piece as Gemini generates it, so
+        speech synthesis can start on the first sentence while the rest is
+        still being generated. Yields ERROR_RESPONSE if the request fails
+        before any text arrived; a failure mid-response ends the stream.
         """
         if not prompt or not prompt.strip():
-            return ""
-        
+            return
+
         log_message(f"Sending to Gemini: {prompt}")
+        self._refresh_context_cache()
+        history = self.memory.contents(prompt) if self.memory is not None else []
+        contents = history + [{"role": "user", "parts": [prompt]}]
+        parts = []
+        usage = None
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text
-            log_message(f"Gemini responded: {text}")
-            return text
+            for chunk in self.model.generate_content(contents, stream=True):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                try:
+                    delta = chunk.text
+                except ValueError:
+                    continue # A chunk without text parts (e.g. only a finish reason)
+                if delta:
+                    parts.append(delta)
+                    yield delta
         except Exception as e:
             log_message(f"Error communicating with Gemini: {e}")
-            return "すみません、ご主人。少し考えごとをしていました。もう一度お願いできますか？"
-
+            if not parts:
+                yield self.ERROR_RESPONSE
+            return
+        log_message(f"Gemini responded: {''.join(parts)}")
+        if usage is not None:
+            log_message(f"Gemini tokens: {usage.prompt_token_count} in "
+                        f"({getattr(usage, 'cached_content_token_count', 0)} cached), "
+                        f"{usage.candidates_token_count} out; {len(contents) // 2} earlier exchange(s) sent.")
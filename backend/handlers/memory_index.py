@@ -0,0 +1,305 @@
+# backend/handlers/memory_index.py
+
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+import numpy as np
+from utils.logging_config import log_message
+
+_IGNORED = re.compile(r"[\W_]+") # Whitespace and punctuation (、。！？「」 included)
+
+def char_ngrams(text, n=2):
+    """Character n-grams of NFKC-normalized, lowercased text without spaces and punctuation."""
+    text = _IGNORED.sub("", unicodedata.normalize("NFKC", text or "").lower())
+    if len(text) < n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+class MemoryIndex:
+    """
+    Long-term memory over conversation_logs: finds the past exchanges most
+    related to a new prompt, on the CPU, without any model.
+
+    Each exchange (user text + Sayo's reply) is a bag of character
+    n-grams, which suits Japanese without a tokenizer. Postings live in a
+    compressed base (term -> sorted doc positions and term frequencies, as
+    NumPy arrays) plus small per-term lists for exchanges added since the
+    last compaction, so `add` is incremental and cheap. Every
+    `compact_every` additions the lists are merged into a new base on a
+    background thread and the index is saved to `path`. Searches keep
+    running against the old base while that happens. `search` ranks with
+    BM25 (TF-IDF with length normalization). N-grams that appear in a
+    large share of all exchanges carry almost no weight, so they are
+    skipped to keep queries fast.
+
+    The saved index also records `indexed_until`: every row up to that id
+    is indexed. Rows after it may be indexed only in part (the app closed
+    during a catch-up while new turns were being added), so `catch_up`
+    starts there and skips the ones already present.
+    """
+    def __init__(self, path=None, ngram=2, k1=1.2, b=0.75, max_df=0.2, compact_every=1000):
+        self.path = path
+        self.ngram = ngram
+        self.k1 = k1
+        self.b = b
+        self.max_df = max_df
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._compacting = False
+        self._catching_up = False
+        self._caught_up = False # Set once catch_up has indexed every older row
+        self._compaction = None # Background compaction thread, if one was started
+        self._reset()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _reset(self):
+        # Base: postings of term i are _docs/_tfs[_indptr[i]:_indptr[i + 1]]
+        self._terms = []
+        self._vocab = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._docs = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.float32)
+        self._base_size = 0 # Exchanges covered by the base
+        # Exchanges added since: term -> ([positions], [tfs]); the last dict receives new ones
+        self._deltas = [{}]
+        self._pending = 0
+        # Per position (order of addition)
+        self._log_ids = np.zeros(1024, dtype=np.int64)
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self.size = 0
+        self._total_length = 0.0
+        self._indexed_until = 0
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                if int(data["ngram"]) != self.ngram:
+                    log_message(f"Memory index {self.path} uses {int(data['ngram'])}-grams; starting over.")
+                    return
+                self._terms = data["terms"].tolist()
+                self._indptr = data["indptr"]
+                self._docs = data["docs"]
+                self._tfs = data["tfs"]
+                log_ids = data["log_ids"]
+                lengths = data["lengths"]
+                # Files saved before the field existed were only ever caught up in full
+                indexed_until = int(data["indexed_until"]) if "indexed_until" in data.files else \
+                    int(log_ids.max(initial=0))
+        except (OSError, KeyError, ValueError) as e:
+            log_message(f"Could not load memory index {self.path} ({e}); starting over.")
+            self._reset()
+            return
+        self._vocab = {term: i for i, term in enumerate(self._terms)}
+        self.size = self._base_size = len(log_ids)
+        capacity = max(1024, 2 * self.size)
+        self._log_ids = np.zeros(capacity, dtype=np.int64)
+        self._lengths = np.zeros(capacity, dtype=np.float32)
+        self._log_ids[:self.size] = log_ids
+        self._lengths[:self.size] = lengths
+        self._total_length = float(lengths.sum())
+        self._indexed_until = indexed_until
+        log_message(f"Memory index loaded: {self.size} exchanges, {len(self._terms)} n-grams.")
+
+    @property
+    def last_log_id(self):
+        with self._lock:
+            return int(self._log_ids[:self.size].max()) if self.size else 0
+
+    def add(self, log_id, user_text, sayo_text):
+        """Indexes one logged exchange. Called for every conversation_logs row."""
+        counts = Counter(char_ngrams(f"{user_text or ''}\n{sayo_text or ''}", self.ngram))
+        with self._lock:
+            if self.size == len(self._log_ids):
+                self._log_ids = np.concatenate([self._log_ids, np.zeros_like(self._log_ids)])
+                self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+            position = self.size
+            self._log_ids[position] = log_id
+            self._lengths[position] = sum(counts.values())
+            self._total_length += self._lengths[position]
+            delta = self._deltas[-1]
+            for term, tf in counts.items():
+                postings = delta.get(term)
+                if postings is None:
+                    delta[term] = ([position], [tf])
+                else:
+                    postings[0].append(position)
+                    postings[1].append(tf)
+            self.size += 1
+            self._pending += 1
+            compact = self._pending >= self.compact_every and not self._compacting and not self._catching_up
+            if compact:
+                self._compacting = True
+        if compact:
+            self._compaction = threading.Thread(target=self._compact_and_save, daemon=True)
+            self._compaction.start()
+
+    def catch_up(self, db_handler, until_log_id):
+        """
+        Indexes the rows logged while the index was not running (ids up to
+        `until_log_id`; newer rows arrive through `add`). A first run over
+        an existing conversation log indexes all of it once; if it is cut
+        short, the next run goes on where it stopped.
+        """
+        start = time.perf_counter()
+        if self.last_log_id > until_log_id:
+            log_message("Memory index is newer than the conversation log; rebuilding it.")
+            with self._lock:
+                self._reset()
+        with self._lock:
+            self._catching_up = True
+            start_id = self._indexed_until
+            log_ids = self._log_ids[:self.size]
+            present = set(log_ids[log_ids > start_id].tolist())
+        added = 0
+        try:
+            for log_id, user_text, sayo_text in db_handler.get_conversations_after(start_id, limit=None):
+                if log_id > until_log_id:
+                    break
+                if log_id not in present:
+                    self.add(log_id, user_text, sayo_text)
+                    added += 1
+            with self._lock:
+                self._caught_up = True
+        finally:
+            with self._lock:
+                self._catching_up = False
+        if added or start_id < until_log_id:
+            self.save()
+        log_message(f"Memory index ready: {self.size} exchanges ({added} indexed now, "
+                    f"{time.perf_counter() - start:.2f}s).")
+
+    def _postings(self, term):
+        """All (positions, tfs) of `term`: the base plus every delta. Caller holds the lock."""
+        docs, tfs = [], []
+        row = self._vocab.get(term)
+        if row is not None:
+            docs.append(self._docs[self._indptr[row]:self._indptr[row + 1]])
+            tfs.append(self._tfs[self._indptr[row]:self._indptr[row + 1]])
+        for delta in self._deltas:
+            postings = delta.get(term)
+            if postings is not None:
+                docs.append(np.asarray(postings[0], dtype=np.int32))
+                tfs.append(np.asarray(postings[1], dtype=np.float32))
+        if len(docs) == 1:
+            return docs[0], tfs[0]
+        if not docs:
+            return None, None
+        return np.concatenate(docs), np.concatenate(tfs)
+
+    def search(self, text, k=3, max_log_id=None):
+        """
+        Returns up to `k` (log_id, score) pairs for the exchanges most
+        related to `text`, best first, only from rows with id <= max_log_id
+        if given. The score is normalized by the query: about 1.0 means an
+        exchange of average length containing every n-gram of `text`.
+        """
+        counts = Counter(char_ngrams(text, self.ngram))
+        if not counts:
+            return []
+        with self._lock:
+            n = self.size
+            if n == 0:
+                return []
+            lengths = self._lengths[:n]
+            norm = self.k1 * (1.0 - self.b + self.b * lengths * (n / self._total_length if self._total_length else 0.0))
+            scores = np.zeros(n, dtype=np.float32)
+            best_possible = 0.0
+            for term, query_tf in counts.items():
+                docs, tfs = self._postings(term)
+                df = 0 if docs is None else len(docs)
+                idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+                best_possible += query_tf * idf
+                if df == 0 or (df > 1000 and df > self.max_df * n):
+                    continue # Absent, or so common that it says nothing (and costs the most)
+                scores[docs] += query_tf * idf * tfs * (self.k1 + 1.0) / (tfs + norm[docs])
+            if max_log_id is not None:
+                scores[self._log_ids[:n] > max_log_id] = 0.0
+            log_ids = self._log_ids[:n]
+            if n > k:
+                # On -scores with a small kth: most scores are 0, and selecting
+                # the largest from the far end of such an array is ~20x slower
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(n)
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(int(log_ids[i]), float(scores[i]) / best_possible) for i in top if scores[i] > 0.0]
+
+    def _compact_and_save(self):
+        try:
+            self._compact()
+            self._save()
+        except Exception as e:
+            log_message(f"Error while compacting the memory index: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _compact(self):
+        """Merges the deltas into a new base. Searches use the old one meanwhile."""
+        with self._lock:
+            frozen = self._deltas
+            self._deltas = frozen + [{}]
+            self._pending = 0
+            base_size = self.size # Positions are sequential, so these are exactly the frozen ones
+        terms = list(self._terms)
+        vocab = dict(self._vocab)
+        rows, docs, tfs = [], [], []
+        for delta in frozen:
+            for term, (positions, frequencies) in delta.items():
+                row = vocab.get(term)
+                if row is None:
+                    row = vocab[term] = len(terms)
+                    terms.append(term)
+                rows.extend([row] * len(positions))
+                docs.extend(positions)
+                tfs.extend(frequencies)
+        base_rows = np.repeat(np.arange(len(self._terms), dtype=np.int64), np.diff(self._indptr))
+        all_rows = np.concatenate([base_rows, np.asarray(rows, dtype=np.int64)])
+        # Stable: within a term, older positions (base) stay ahead of newer ones
+        order = np.argsort(all_rows, kind="stable")
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(all_rows, minlength=len(terms)), out=indptr[1:])
+        all_docs = np.concatenate([self._docs, np.asarray(docs, dtype=np.int32)])[order]
+        all_tfs = np.concatenate([self._tfs, np.asarray(tfs, dtype=np.float32)])[order]
+        with self._lock:
+            self._terms, self._vocab = terms, vocab
+            self._indptr, self._docs, self._tfs = indptr, all_docs, all_tfs
+            self._deltas = self._deltas[len(frozen):]
+            self._base_size = base_size
+
+    def _save(self):
+        """Writes the base to `path` (atomically). Only exchanges in the base are saved."""
+        if not self.path:
+            return
+        with self._lock:
+            terms, indptr, docs, tfs = self._terms, self._indptr, self._docs, self._tfs
+            log_ids = self._log_ids[:self._base_size].copy()
+            lengths = self._lengths[:self._base_size].copy()
+            # Once caught up, rows arrive in order, so the base covers every id up to its newest
+            indexed_until = max(self._indexed_until, int(log_ids.max(initial=0))) if self._caught_up else self._indexed_until
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, ngram=self.ngram, terms=np.array(terms, dtype=f"<U{self.ngram}"),
+                     indptr=indptr, docs=docs, tfs=tfs, log_ids=log_ids, lengths=lengths,
+                     indexed_until=indexed_until)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        """Compacts and saves now (e.g. at shutdown), unless a compaction is already running."""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        self._compact_and_save()
+
+    def close(self):
+        """Waits for a running compaction, then saves what was added after it."""
+        if self._compaction is not None:
+            self._compaction.join()
+        if self._pending:
+            self.save()
@@ -0,0 +1,199 @@
+# backend/handlers/playback_engine.py
+
+import threading
+import queue
+import itertools
+from collections import deque
+import numpy as np
+import sounddevice as sd
+from utils.logging_config import log_message
+
+def to_float32(samples):
+    """Converts int16/int32/uint8/float PCM to float32 in [-1, 1], shape (frames, channels)."""
+    samples = np.asarray(samples)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768.0
+    if samples.dtype == np.int32:
+        return samples.astype(np.float32) / 2147483648.0
+    if samples.dtype == np.uint8:
+        return (samples.astype(np.float32) - 128.0) / 128.0
+    return samples.astype(np.float32, copy=False)
+
+def resample(samples, source_rate, target_rate):
+    """Linear-interpolation resampling of (frames, channels) float32 audio."""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    frames = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(frames) * (source_rate / target_rate)
+    source_positions = np.arange(len(samples))
+    return np.stack(
+        [np.interp(positions, source_positions, samples[:, c]) for c in range(samples.shape[1])], axis=1
+    ).astype(np.float32)
+
+class _Chunk:
+    __slots__ = ("id", "samples", "position", "on_complete")
+
+    def __init__(self, chunk_id, samples, on_complete):
+        self.id = chunk_id
+        self.samples = samples
+        self.position = 0
+        self.on_complete = on_complete
+
+class PlaybackEngine:
+    """
+    Non-blocking audio output on one persistent low-latency OutputStream.
+
+    `enqueue` converts a PCM buffer to the stream's format (sample type,
+    channel count, sample rate) and appends it to a queue that the audio
+    callback plays back to back, so consecutive sentences are gapless.
+    `mix=True` instead plays the buffer on top of whatever is queued (e.g.
+    a chime during speech). Completion callbacks run on a separate thread,
+    never inside the audio callback: on_complete(True) after the last
+    sample was played, on_complete(False) if the chunk was stopped/flushed.
+    """
+    def __init__(self, sample_rate=24000, channels=1, block_size=512, latency="low", level_window=0.3):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self.latency = latency
+        self.stream = None
+        self._queue = deque() # Chunks played one after another
+        self._overlays = [] # Chunks mixed on top of the queue
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._ids = itertools.count(1)
+        # RMS of the last few output blocks, covering the echo path delay
+        self._levels = deque([0.0], maxlen=max(1, int(level_window * sample_rate / block_size)))
+        # Called with every output block as it is produced (e.g. echo reference)
+        self.output_listener = None
+        self._notifications = queue.SimpleQueue()
+        threading.Thread(target=self._notify_loop, daemon=True).start()
+
+    def start(self):
+        """Opens the output stream once; it stays open (playing silence when idle)."""
+        if self.stream is not None:
+            return
+        self.stream = sd.OutputStream(samplerate=self.sample_rate, channels=self.channels,
+                                      dtype="float32", blocksize=self.block_size,
+                                      latency=self.latency, callback=self._callback)
+        self.stream.start()
+        log_message(f"Audio playback stream started ({self.sample_rate} Hz, {self.block_size}-frame blocks).")
+
+    def close(self):
+        """Stops playback and closes the output stream."""
+        self.stop()
+        if self.stream is None:
+            return
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception as e:
+            log_message(f"Error closing playback stream: {e}")
+        self.stream = None
+
+    def enqueue(self, audio, sample_rate=None, on_complete=None, mix=False):
+        """
+        Queues `audio` (a PCMAudio, or samples plus `sample_rate`) and returns
+        immediately with the chunk's id. Starts the stream if needed.
+        """
+        if sample_rate is None:
+            audio, sample_rate = audio
+        samples = self._convert(audio, sample_rate)
+        chunk = _Chunk(next(self._ids), samples, on_complete)
+        if self.stream is None:
+            self.start()
+        with self._lock:
+            (self._overlays.append if mix else self._queue.append)(chunk)
+            self._idle.clear()
+        return chunk.id
+
+    def _convert(self, samples, sample_rate):
+        samples = to_float32(samples)
+        if samples.shape[1] != self.channels:
+            mono = samples.mean(axis=1, keepdims=True)
+            samples = np.repeat(mono, self.channels, axis=1)
+        return np.ascontiguousarray(resample(samples, sample_rate, self.sample_rate))
+
+    def stop(self):
+        """Silences output at the next block and drops everything queued."""
+        with self._lock:
+            dropped = list(self._queue) + self._overlays
+            self._queue.clear()
+            self._overlays = []
+            self._idle.set()
+        for chunk in dropped:
+            self._notify(chunk, False)
+        return len(dropped)
+
+    def flush(self):
+        """Drops queued chunks that have not started yet; the current one plays to the end."""
+        with self._lock:
+            pending = [chunk for chunk in self._queue if chunk.position == 0]
+            for chunk in pending:
+                self._queue.remove(chunk)
+            self._update_idle()
+        for chunk in pending:
+            self._notify(chunk, False)
+        return len(pending)
+
+    def wait(self, timeout=None):
+        """Blocks until everything queued has been played. Returns False on timeout."""
+        return self._idle.wait(timeout)
+
+    @property
+    def is_playing(self):
+        return not self._idle.is_set()
+
+    def output_level(self):
+        """Loudest recent output block (RMS); 0.0 once the speaker has been silent for a while."""
+        return max(self._levels)
+
+    def _update_idle(self):
+        if not self._queue and not self._overlays:
+            self._idle.set()
+
+    def _callback(self, outdata, frames, time_info, status):
+        """Fills one output block from the queue (gapless) plus any overlays."""
+        outdata.fill(0)
+        finished = []
+        with self._lock:
+            filled = 0
+            while filled < frames and self._queue:
+                chunk = self._queue[0]
+                n = min(frames - filled, len(chunk.samples) - chunk.position)
+                outdata[filled:filled + n] = chunk.samples[chunk.position:chunk.position + n]
+                chunk.position += n
+                filled += n
+                if chunk.position >= len(chunk.samples):
+                    finished.append(self._queue.popleft())
+
+            for chunk in self._overlays:
+                n = min(frames, len(chunk.samples) - chunk.position)
+                outdata[:n] += chunk.samples[chunk.position:chunk.position + n]
+                chunk.position += n
+                if chunk.position >= len(chunk.samples):
+                    finished.append(chunk)
+            if self._overlays:
+                self._overlays = [chunk for chunk in self._overlays if chunk.position < len(chunk.samples)]
+                np.clip(outdata, -1.0, 1.0, out=outdata)
+            self._update_idle()
+        self._levels.append(float(np.sqrt(np.mean(np.square(outdata)))))
+        if self.output_listener is not None:
+            self.output_listener(outdata)
+        for chunk in finished:
+            self._notify(chunk, True)
+
+    def _notify(self, chunk, completed):
+        if chunk.on_complete is not None:
+            self._notifications.put((chunk.on_complete, completed))
+
+    def _notify_loop(self):
+        while True:
+            on_complete, completed = self._notifications.get()
+            try:
+                on_complete(completed)
+            except Exception as e:
+                log_message(f"Error in playback completion callback: {e}")
@@ -0,0 +1,42 @@
+# backend/handlers/recognition_result.py
+
+class RecognitionResult:
+    """
+    Transcript plus the Whisper quality signals needed to reject junk turns.
+      no_speech_prob:    highest per-segment probability that there was no speech
+      avg_logprob:       mean token log probability, weighted by segment length
+      compression_ratio: highest per-segment gzip ratio (repetitive hallucinations are high)
+    """
+    def __init__(self, text="", no_speech_prob=0.0, avg_logprob=0.0, compression_ratio=1.0, segments=None):
+        self.text = text
+        self.no_speech_prob = no_speech_prob
+        self.avg_logprob = avg_logprob
+        self.compression_ratio = compression_ratio
+        self.segments = segments or []
+
+    @classmethod
+    def from_whisper(cls, result, text=None):
+        """Builds a result from a Whisper-style transcribe() dict."""
+        segments = result.get("segments", [])
+        if text is None:
+            text = result.get("text", "")
+        if not segments:
+            return cls(text=text, segments=[])
+
+        weights = [max(segment.get("end", 0.0) - segment.get("start", 0.0), 1e-3) for segment in segments]
+        avg_logprob = sum(w * segment.get("avg_logprob", 0.0) for w, segment in zip(weights, segments)) / sum(weights)
+        return cls(
+            text=text,
+            no_speech_prob=max(segment.get("no_speech_prob", 0.0) for segment in segments),
+            avg_logprob=avg_logprob,
+            compression_ratio=max(segment.get("compression_ratio", 1.0) for segment in segments),
+            segments=segments,
+        )
+
+    def __str__(self):
+        return self.text
+
+    def describe(self):
+        """One-line summary of the quality signals for logs."""
+        return (f"no_speech={self.no_speech_prob:.2f}, avg_logprob={self.avg_logprob:.2f}, "
+                f"compression={self.compression_ratio:.2f}")
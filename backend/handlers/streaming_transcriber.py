@@ -0,0 +1,122 @@
+# backend/handlers/streaming_transcriber.py
+
+import threading
+from utils.logging_config import log_message
+from handlers.recognition_result import RecognitionResult
+
+class StreamingTranscriber:
+    """
+    Incremental Whisper transcription while the user is still talking.
+
+    A worker thread re-decodes the not-yet-committed part of the recording
+    every `step_duration` seconds. Words on which two consecutive hypotheses
+    agree (LocalAgreement-2) are committed, and the next window starts where
+    the last committed word ends. At end of speech only the tail after the
+    committed prefix has to be decoded.
+    """
+    def __init__(self, whisper_model, sample_rate, step_duration=1.0, max_window_duration=15.0, on_partial=None):
+        self.whisper_model = whisper_model
+        self.sample_rate = sample_rate
+        self.step_samples = int(step_duration * sample_rate)
+        self.max_window_samples = int(max_window_duration * sample_rate)
+        self.on_partial = on_partial
+
+        self.committed_words = []
+        self.committed_end = 0 # Sample index where the committed prefix ends
+        self.previous_words = []
+        self.last_result = {} # Raw result of the most recent decode
+        self._read_audio = None
+        self._get_length = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def committed_text(self):
+        return "".join(word for _, _, word in self.committed_words)
+
+    def start(self, read_audio, get_length, start_index=0):
+        """
+        Starts the worker. `read_audio(start, end)` must return mono float32
+        samples of the recording and `get_length()` its current length.
+        """
+        self._read_audio = read_audio
+        self._get_length = get_length
+        self.committed_end = start_index
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the worker, waiting for an in-flight decode to finish."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def finish(self, audio):
+        """
+        Stops the worker and decodes the remaining tail of `audio` (the full
+        recording). Returns a RecognitionResult with the complete transcript;
+        its quality signals come from the last decode (normally the tail).
+        """
+        self.stop()
+
+        tail = audio[self.committed_end:]
+        tail_text = ""
+        if tail.size > 0:
+            words = self._transcribe(tail, self.committed_end)
+            tail_text = "".join(word for _, _, word in words)
+        text = self.committed_text + tail_text
+        log_message(f"Streaming ASR: committed {len(self.committed_words)} words, decoded {tail.size / self.sample_rate:.2f}s tail.")
+        return RecognitionResult.from_whisper(self.last_result, text=text)
+
+    def _run(self):
+        decoded_until = self.committed_end
+        while not self._stop_event.is_set():
+            length = self._get_length()
+            if length - decoded_until < self.step_samples:
+                self._stop_event.wait(0.05)
+                continue
+            decoded_until = length
+            try:
+                self._process_window(length)
+            except Exception as e:
+                log_message(f"Error during streaming recognition: {e}")
+
+    def _process_window(self, end):
+        start = self.committed_end
+        words = self._transcribe(self._read_audio(start, end), start)
+
+        # Commit the common prefix of the last two hypotheses
+        agreed = 0
+        while (agreed < len(words) and agreed < len(self.previous_words)
+               and words[agreed][2] == self.previous_words[agreed][2]):
+            agreed += 1
+
+        # A window that grows too long is force-committed up to its last word
+        if agreed == 0 and end - start > self.max_window_samples and len(words) > 1:
+            agreed = len(words) - 1
+
+        if agreed:
+            self.committed_words.extend(words[:agreed])
+            self.committed_end = min(end, int(words[agreed - 1][1] * self.sample_rate))
+        self.previous_words = words[agreed:]
+
+        if self.on_partial:
+            tentative = "".join(word for _, _, word in self.previous_words)
+            self.on_partial(self.committed_text, tentative)
+
+    def _transcribe(self, audio, offset):
+        """Decodes `audio` and returns (start, end, word) with absolute times."""
+        result = self.whisper_model.transcribe(
+            audio, language="ja", task="transcribe",
+            word_timestamps=True, condition_on_previous_text=False,
+            initial_prompt=self.committed_text or None
+        )
+        self.last_result = result
+        offset_seconds = offset / self.sample_rate
+        words = []
+        for segment in result.get("segments", []):
+            for word in segment.get("words", []):
+                words.append((word["start"] + offset_seconds, word["end"] + offset_seconds, word["word"]))
+        return words
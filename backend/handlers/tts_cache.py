@@ -0,0 +1,148 @@
+# backend/handlers/tts_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.logging_config import log_message
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized WAV bytes.
+
+    Keys are a hash of everything that affects the audio (text, speaker,
+    synthesis parameters, engine version). Entries live on disk under
+    `cache_dir` with a small in-memory LRU in front of it. The size and
+    recency of every file on disk are tracked in memory too, so neither
+    lookups nor eviction have to scan the directory. Files are written and
+    deleted on a background thread, off the path to the first audio. Once
+    over `max_bytes`, the least recently used files are evicted down to
+    `low_water` x max_bytes, so not every later put evicts again.
+    """
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, memory_items=64, low_water=0.9):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.low_water_bytes = int(max_bytes * low_water)
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Disk writes and deletes, in order, on one thread
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        # key -> size of every file on disk, least recently used first
+        self._disk = OrderedDict()
+        entries = []
+        for name in os.listdir(cache_dir):
+            if name.endswith(".wav"):
+                try:
+                    stat = os.stat(os.path.join(cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name[:-len(".wav")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+        self._disk_bytes = sum(self._disk.values())
+        log_message(f"TTS cache at {cache_dir} ({len(self._disk)} entries, {self._disk_bytes / 1024 / 1024:.1f} MB).")
+
+    @staticmethod
+    def make_key(text, speaker_id, synthesis_params, engine_version):
+        payload = json.dumps(
+            {"text": text, "speaker": speaker_id, "params": synthesis_params or {}, "engine": engine_version},
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, key):
+        """Returns the cached WAV bytes for `key`, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                return self._memory[key]
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None # Deleted behind our back, or its write is still queued
+        # Keeps the recency order across restarts
+        self._writer.submit(self._touch, path)
+        self._remember(key, data)
+        return data
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def put(self, key, data):
+        """
+        Stores WAV bytes under `key`. They are served from memory right
+        away; the file is written (and old entries evicted) in the background.
+        """
+        self._remember(key, data)
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+                return
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            evicted = []
+            if self._disk_bytes > self.max_bytes:
+                while self._disk_bytes > self.low_water_bytes and len(self._disk) > 1:
+                    old_key, size = self._disk.popitem(last=False)
+                    self._disk_bytes -= size
+                    evicted.append(old_key)
+        self._writer.submit(self._write, key, data)
+        if evicted:
+            self._writer.submit(self._remove, evicted)
+
+    def flush(self):
+        """Waits until every queued disk write has finished."""
+        self._writer.submit(lambda: None).result()
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _write(self, key, data):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path) # Atomic, so readers never see half a file
+        except OSError as e:
+            log_message(f"Could not write TTS cache entry: {e}")
+            with self._lock:
+                if self._disk.pop(key, None) is not None:
+                    self._disk_bytes -= len(data)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remove(self, keys):
+        for key in keys:
+            with self._lock:
+                if key in self._disk:
+                    continue # Put again after it was evicted
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        log_message(f"TTS cache: evicted {len(keys)} entries ({self._disk_bytes / 1024 / 1024:.1f} MB left).")
@@ -0,0 +1,243 @@
+# backend/handlers/vad.py
+
+import numpy as np
+from utils.audio_features import frame_signal
+
+class EnergyVAD:
+    """
+    The original detector: a block is speech if its RMS exceeds a fixed
+    threshold. Kept as the reference implementation and fallback.
+    """
+    def __init__(self, sample_rate, block_size, threshold=0.02):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.threshold = threshold
+        self.hangover_duration = 0.0
+
+    def reset(self):
+        pass
+
+    def process(self, samples):
+        """
+        Classifies `samples` (mono, any length) in block_size steps.
+        Returns one bool per complete block.
+        """
+        blocks = _as_blocks(samples, self.block_size)
+        if blocks.shape[0] == 0:
+            return np.zeros(0, dtype=bool)
+        rms = np.sqrt(np.einsum("ij,ij->i", blocks, blocks) / self.block_size)
+        return rms > self.threshold
+
+class AdaptiveVAD:
+    """
+    Batch voice activity detector with an adaptive noise floor.
+
+    Per block it computes, vectorized over all blocks passed in at once:
+      - log energy, compared against a tracked noise floor,
+      - zero-crossing rate (voiced speech crosses zero far less than hiss),
+      - fraction of energy in the 300-3400 Hz speech band.
+    A block is speech if it is loud enough and looks voiced or band-limited.
+    The noise floor follows quiet blocks quickly and loud blocks slowly, so
+    a fan or a TV in the background raises the bar instead of keeping every
+    recording open. Decisions are smoothed with an onset count and a
+    hangover so short dips between words do not end the utterance.
+    """
+    def __init__(self, sample_rate, block_size, min_threshold=0.005, snr_db=6.0,
+                 max_zcr=0.25, min_band_ratio=0.6, onset_blocks=2, hangover_blocks=4,
+                 floor_rise=0.02, floor_fall=0.3):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.min_threshold_db = 20 * np.log10(min_threshold)
+        self.snr_db = snr_db
+        self.max_zcr = max_zcr
+        self.min_band_ratio = min_band_ratio
+        self.onset_blocks = onset_blocks
+        self.hangover_blocks = hangover_blocks
+        # Silence already waited out by the hangover; the Endpointer subtracts it
+        self.hangover_duration = hangover_blocks * block_size / sample_rate
+        self.floor_rise = floor_rise
+        self.floor_fall = floor_fall
+
+        freqs = np.fft.rfftfreq(block_size, 1.0 / sample_rate)
+        self._speech_band = (freqs >= 300) & (freqs <= 3400)
+        self._window = np.hanning(block_size).astype(np.float32)
+        self.noise_floor_db = None
+        self.reset()
+
+    def reset(self):
+        """Clears the smoothing state. The noise floor is kept across turns."""
+        self._speech_run = 0
+        self._hangover = 0
+        self.in_speech = False
+
+    def features(self, blocks):
+        """Returns (energy_db, zcr, band_ratio) arrays, one value per block."""
+        energy = np.einsum("ij,ij->i", blocks, blocks) / self.block_size
+        energy_db = 10 * np.log10(energy + 1e-12)
+
+        signs = np.signbit(blocks)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.block_size - 1)
+
+        spectrum = np.abs(np.fft.rfft(blocks * self._window, axis=1)) ** 2
+        total = spectrum.sum(axis=1) + 1e-12
+        band_ratio = spectrum[:, self._speech_band].sum(axis=1) / total
+        return energy_db, zcr, band_ratio
+
+    def process(self, samples):
+        """
+        Classifies `samples` (mono, any length) in block_size steps.
+        Returns one smoothed bool per complete block.
+        """
+        blocks = _as_blocks(samples, self.block_size)
+        n = blocks.shape[0]
+        decisions = np.zeros(n, dtype=bool)
+        if n == 0:
+            return decisions
+
+        energy_db, zcr, band_ratio = self.features(blocks)
+        # Voiced speech has a low ZCR; unvoiced consonants concentrate in the speech band
+        spectral_ok = (zcr <= self.max_zcr) | (band_ratio >= self.min_band_ratio)
+
+        for i in range(n):
+            if self.noise_floor_db is None:
+                self.noise_floor_db = energy_db[i]
+            threshold_db = max(self.noise_floor_db + self.snr_db, self.min_threshold_db)
+            raw = energy_db[i] > threshold_db and spectral_ok[i]
+
+            # Noise floor: fall fast on quiet blocks, creep up slowly otherwise
+            if not raw:
+                rate = self.floor_fall if energy_db[i] < self.noise_floor_db else self.floor_rise
+                self.noise_floor_db += rate * (energy_db[i] - self.noise_floor_db)
+
+            # Onset / hangover smoothing
+            if raw:
+                self._speech_run += 1
+                if self._speech_run >= self.onset_blocks:
+                    self.in_speech = True
+                    self._hangover = self.hangover_blocks
+            else:
+                self._speech_run = 0
+                if self._hangover > 0:
+                    self._hangover -= 1
+                else:
+                    self.in_speech = False
+            decisions[i] = self.in_speech
+        return decisions
+
+class Endpointer:
+    """
+    Turns per-block VAD decisions into start/end-of-utterance events.
+    End of speech is declared after `silence_duration` of non-speech blocks
+    following at least one speech block. Pass the VAD to discount its
+    hangover, which already counts as silence.
+    """
+    def __init__(self, sample_rate, block_size, silence_duration, vad=None):
+        self.block_size = block_size
+        self.block_duration = block_size / sample_rate
+        self.hangover_duration = vad.hangover_duration if vad is not None else 0.0
+        if vad is not None:
+            silence_duration -= vad.hangover_duration
+        self.silence_blocks = max(1, int(round(silence_duration * sample_rate / block_size)))
+        self.reset()
+
+    def reset(self):
+        self.started = False
+        self.ended = False
+        self.start_block = None
+        self.end_block = None
+        self.last_speech_block = None
+        self._silent_run = 0
+        self._blocks_seen = 0
+
+    def feed(self, decisions):
+        """Consumes decisions in order. Returns True once end of speech is reached."""
+        for is_speech in decisions:
+            if self.ended:
+                break
+            if is_speech:
+                if not self.started:
+                    self.started = True
+                    self.start_block = self._blocks_seen
+                self.last_speech_block = self._blocks_seen
+                self._silent_run = 0
+            elif self.started:
+                self._silent_run += 1
+                if self._silent_run >= self.silence_blocks:
+                    self.ended = True
+                    self.end_block = self._blocks_seen
+            self._blocks_seen += 1
+        return self.ended
+
+    def trailing_silence(self):
+        """
+        Seconds between the end of the last speech and the end of the last
+        block fed, including the VAD hangover (0.0 if still in speech).
+        """
+        if self.last_speech_block is None or self.last_speech_block == self._blocks_seen - 1:
+            return 0.0
+        return (self._blocks_seen - 1 - self.last_speech_block) * self.block_duration + self.hangover_duration
+
+def create_vad(name, sample_rate, block_size, threshold):
+    """Builds the VAD selected in config ("energy" or "adaptive")."""
+    if name == "energy":
+        return EnergyVAD(sample_rate, block_size, threshold=threshold)
+    if name == "adaptive":
+        return AdaptiveVAD(sample_rate, block_size, min_threshold=threshold / 4)
+    raise ValueError(f"Unknown VAD: {name}")
+
+def _as_blocks(samples, block_size):
+    """(n_blocks, block_size) float32 view of the complete blocks in `samples`."""
+    samples = np.ascontiguousarray(samples, dtype=np.float32).reshape(-1)
+    n = samples.size // block_size
+    return frame_signal(samples[:n * block_size], block_size, block_size) if n else np.zeros((0, block_size), dtype=np.float32)
+
+def find_speech_segments(decisions, block_size, total_samples, margin_samples=0,
+                         min_pause_samples=0, max_segment_samples=None):
+    """
+    Turns per-block VAD decisions over a whole recording into (start, end)
+    sample ranges worth transcribing:
+      - leading and trailing silence is trimmed, keeping `margin_samples`,
+      - speech separated by pauses shorter than `min_pause_samples` stays together,
+      - segments are cut at pauses so none exceeds `max_segment_samples`
+        (a single run of speech longer than that is split hard).
+    Returns [] if the VAD found no speech at all.
+    """
+    regions = []
+    start = None
+    for i, is_speech in enumerate(decisions):
+        if is_speech and start is None:
+            start = i
+        elif not is_speech and start is not None:
+            regions.append([start * block_size, i * block_size])
+            start = None
+    if start is not None:
+        regions.append([start * block_size, len(decisions) * block_size])
+    if not regions:
+        return []
+
+    # Close short pauses
+    merged = [regions[0]]
+    for region in regions[1:]:
+        if region[0] - merged[-1][1] < min_pause_samples:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+
+    # Group regions into segments no longer than max_segment_samples.
+    # Each segment is [start, end, pad_start, pad_end]; hard split points get no margin.
+    segments = []
+    for region_start, region_end in merged:
+        if segments and (max_segment_samples is None or region_end - segments[-1][0] <= max_segment_samples):
+            segments[-1][1] = region_end
+            continue
+        pad_start = True
+        if max_segment_samples is not None:
+            while region_end - region_start > max_segment_samples:
+                segments.append([region_start, region_start + max_segment_samples, pad_start, False])
+                region_start += max_segment_samples
+                pad_start = False
+        segments.append([region_start, region_end, pad_start, True])
+
+    return [(max(0, seg_start - (margin_samples if pad_start else 0)),
+             min(total_samples, seg_end + (margin_samples if pad_end else 0)))
+            for seg_start, seg_end, pad_start, pad_end in segments]
@@ -0,0 +1,138 @@
+# backend/handlers/voicevox_client.py
+
+import asyncio
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class VoicevoxClient:
+    """
+    Thin HTTP client for the VOICEVOX engine API.
+
+    All calls share one pooled keep-alive session, so a sentence costs two
+    requests on an already open connection instead of two TCP handshakes.
+    Every call has a connect and a read timeout; a hung engine raises
+    requests.exceptions.Timeout instead of freezing the conversation loop.
+    Safe to use from several threads at once (up to `pool_size` requests
+    are kept in flight on separate connections).
+    """
+    def __init__(self, base_url, connect_timeout=3.0, read_timeout=30.0, pool_size=4):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        # Retry once only when the connection could not be opened (or a pooled
+        # one turned out to be closed); never re-send after a read timeout
+        retry = Retry(total=1, connect=1, read=0, status=0, redirect=0)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def version(self):
+        response = self.session.get(f"{self.base_url}/version", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def initialize_speaker(self, speaker, skip_reinit=True):
+        """Loads the speaker's voice model now instead of on its first synthesis."""
+        response = self.session.post(
+            f"{self.base_url}/initialize_speaker",
+            params={"speaker": speaker, "skip_reinit": str(skip_reinit).lower()},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+
+    def audio_query(self, text, speaker):
+        response = self.session.post(
+            f"{self.base_url}/audio_query",
+            params={"text": text, "speaker": speaker},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def synthesis(self, audio_query, speaker):
+        """Renders an audio_query and returns the WAV bytes."""
+        response = self.session.post(
+            f"{self.base_url}/synthesis",
+            params={"speaker": speaker},
+            data=json.dumps(audio_query),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.content
+
+    def synthesize(self, text, speaker, query_overrides=None):
+        """audio_query + synthesis in one call. Returns the WAV bytes."""
+        audio_query = self.audio_query(text, speaker)
+        if query_overrides:
+            audio_query.update(query_overrides)
+        return self.synthesis(audio_query, speaker)
+
+    def close(self):
+        self.session.close()
+
+class AsyncVoicevoxClient:
+    """
+    asyncio variant of VoicevoxClient built on aiohttp (optional dependency).
+    `synthesize_many` keeps the audio_query and synthesis calls of several
+    sentences in flight at once over one keep-alive connection pool.
+    Errors surface as aiohttp.ClientError / asyncio.TimeoutError.
+    """
+    def __init__(self, base_url, connect_timeout=3.0, read_timeout=30.0, pool_size=4):
+        try:
+            import aiohttp
+        except ImportError as e:
+            raise ImportError("AsyncVoicevoxClient requires the aiohttp package (pip install aiohttp).") from e
+        self._aiohttp = aiohttp
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+        self.pool_size = pool_size
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            connector = self._aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self.session = self._aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def version(self):
+        async with self.session.get(f"{self.base_url}/version") as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def audio_query(self, text, speaker):
+        async with self.session.post(
+            f"{self.base_url}/audio_query", params={"text": text, "speaker": speaker}
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def synthesis(self, audio_query, speaker):
+        async with self.session.post(
+            f"{self.base_url}/synthesis", params={"speaker": speaker}, json=audio_query
+        ) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def synthesize(self, text, speaker, query_overrides=None):
+        audio_query = await self.audio_query(text, speaker)
+        if query_overrides:
+            audio_query.update(query_overrides)
+        return await self.synthesis(audio_query, speaker)
+
+    async def synthesize_many(self, texts, speaker, query_overrides=None):
+        """Synthesizes all `texts` concurrently; returns WAV bytes in input order."""
+        return await asyncio.gather(*(self.synthesize(text, speaker, query_overrides) for text in texts))
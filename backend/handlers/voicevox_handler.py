@@ -3,26 +3,218 @@
 import requests
 import json
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from utils.logging_config import log_message
+from utils.text_segmenter import split_sentences, iter_sentences
+from handlers.tts_cache import TTSCache
+from handlers.voicevox_router import VoicevoxRouter
+from utils.wav_decoder import decode_wav
 
 class VoicevoxHandler:
-    def __init__(self, base_url, speaker_id):
+    def __init__(self, base_url, speaker_id, max_parallel_synthesis=2, synthesis_params=None,
+                 cache_dir=None, cache_max_bytes=200 * 1024 * 1024, cache_memory_items=64,
+                 connect_timeout=3.0, read_timeout=30.0, health_interval=10.0):
+        # One URL or a list of engine URLs; requests go to the least-loaded healthy engine
         self.base_url = base_url
         self.speaker_id = speaker_id
+        self.max_parallel_synthesis = max_parallel_synthesis
+        # Overrides applied to every audio_query (e.g. {"speedScale": 1.1})
+        self.synthesis_params = synthesis_params or {}
+        self.engine_version = None
+        # One connection per parallel sentence, plus the pre-render and time announcement threads
+        self.client = VoicevoxRouter(base_url, connect_timeout, read_timeout,
+                                     pool_size=max_parallel_synthesis + 2, health_interval=health_interval)
         self._check_voicevox_availability()
+        self.client.start_health_checks()
+        self.cache = TTSCache(cache_dir, cache_max_bytes, cache_memory_items) if cache_dir else None
 
     def _check_voicevox_availability(self):
-        """Checks if the VOICEVOX engine is running."""
+        """Checks that at least one VOICEVOX engine is running."""
         try:
-            response = requests.get(f"{self.base_url}/version")
-            response.raise_for_status()
-            log_message(f"VOICEVOX is running (version: {response.json()}).")
+            healthy = self.client.check_health()
+            self.engine_version = self.client.version()
+            log_message(f"VOICEVOX is running on {healthy}/{len(self.client.engines)} engine(s) "
+                        f"(version: {self.engine_version}).")
         except requests.exceptions.RequestException as e:
             raise ConnectionError(
                 f"VOICEVOX is not running on {self.base_url}. "
                 f"Please start the application. Error: {e}"
             )
 
+    def _synthesize(self, text):
+        """
+        Returns the WAV bytes for `text`, from the cache when possible
+        (no network call at all) and from VOICEVOX otherwise.
+        """
+        key = None
+        if self.cache:
+            key = TTSCache.make_key(text, self.speaker_id, self.synthesis_params, self.engine_version)
+            cached = self.cache.get(key)
+            if cached is not None:
+                log_message(f"TTS cache hit: '{text}'")
+                return cached
+
+        wav_bytes = self._request_synthesis(text)
+        if self.cache:
+            self.cache.put(key, wav_bytes)
+        return wav_bytes
+
+    def _request_synthesis(self, text):
+        """Runs audio_query + synthesis on the engine and returns the WAV bytes."""
+        return self.client.synthesize(text, self.speaker_id, self.synthesis_params)
+
+    def warm_up(self, prerender_phrases=None):
+        """
+        Loads the speaker's voice model on every engine and runs one short
+        synthesis per engine, so the first reply neither waits for the model
+        to load nor opens a fresh connection. Nothing is cached. Afterwards
+        (also if it failed), `prerender_phrases` are pre-rendered in the
+        background on the warmed-up engines.
+        """
+        try:
+            initialized = self.client.initialize_speaker(self.speaker_id)
+            log_message(f"VOICEVOX speaker {self.speaker_id} initialized on {initialized}/{len(self.client.engines)} engine(s).")
+            # Requests go to the least-loaded engine, so consecutive ones rotate over all of them
+            for _ in self.client.engines:
+                self._request_synthesis("あ")
+        finally:
+            if prerender_phrases:
+                self.start_prerender(prerender_phrases)
+
+    def start_prerender(self, phrases):
+        """Runs prerender(phrases) on a background thread."""
+        threading.Thread(target=self.prerender, args=(phrases,), daemon=True).start()
+
+    def prerender(self, phrases):
+        """
+        Renders fixed phrases into the cache ahead of time. Each phrase is
+        cached both whole and per sentence, so it hits the cache in either
+        synthesis mode. Meant to run in a background thread at startup.
+        """
+        if not self.cache:
+            return
+        texts = []
+        for phrase in phrases:
+            for text in [phrase] + split_sentences(phrase):
+                if text not in texts:
+                    texts.append(text)
+
+        rendered = 0
+        failed = 0
+        for text in texts:
+            key = TTSCache.make_key(text, self.speaker_id, self.synthesis_params, self.engine_version)
+            if self.cache.contains(key):
+                continue
+            try:
+                self.cache.put(key, self._request_synthesis(text))
+                rendered += 1
+            except (requests.exceptions.RequestException, KeyError, json.JSONDecodeError) as e:
+                log_message(f"Error pre-rendering '{text}': {e}")
+                failed += 1
+        log_message(f"TTS pre-render finished: {rendered} rendered, {failed} failed, "
+                    f"{len(texts) - rendered - failed} already cached.")
+
+    def synthesize_audio_stream(self, text, filename_prefix=None):
+        """
+        Splits `text` into sentences and synthesizes them concurrently (at
+        most max_parallel_synthesis at a time). Yields one PCMAudio per
+        sentence, in order, as soon as that sentence is ready, so playback of
+        the first sentence can start while the rest is still rendering.
+        Each sentence is also saved to `{filename_prefix}_{i}.wav` if a prefix
+        is given. Sentences that fail to synthesize are skipped.
+        """
+        sentences = split_sentences(text) if text else []
+        if not sentences:
+            log_message("No text provided for speech synthesis.")
+            return
+        log_message(f"Synthesizing {len(sentences)} sentence(s) with up to {self.max_parallel_synthesis} in parallel.")
+        yield from self._synthesize_sentences(sentences, filename_prefix)
+
+    def synthesize_text_stream(self, deltas, filename_prefix=None):
+        """
+        Like synthesize_audio_stream, for text that is still being generated:
+        `deltas` is an iterable of text pieces (e.g. GeminiHandler.think_stream).
+        Each sentence goes to VOICEVOX as soon as its last piece arrives.
+        """
+        yield from self._synthesize_sentences(iter_sentences(deltas), filename_prefix)
+
+    def _synthesize_sentences(self, sentences, filename_prefix=None):
+        """
+        Synthesizes the sentences of an iterable concurrently and yields their
+        PCMAudio in order. The iterable is consumed on a separate thread, so
+        it may block (waiting for the next tokens) while earlier sentences
+        are rendered and played.
+        """
+        def synthesize(index, sentence):
+            wav_bytes = self._synthesize(sentence)
+            if filename_prefix:
+                with open(f"{filename_prefix}_{index}.wav", "wb") as f:
+                    f.write(wav_bytes)
+            return decode_wav(wav_bytes)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel_synthesis)
+        futures = queue.Queue()
+        stopped = threading.Event()
+
+        def submit_all():
+            try:
+                for index, sentence in enumerate(sentences):
+                    if stopped.is_set():
+                        break
+                    futures.put((sentence, executor.submit(synthesize, index, sentence)))
+            except RuntimeError:
+                pass # The executor was shut down because the caller stopped listening
+            except Exception as e:
+                log_message(f"Error while receiving text to synthesize: {e}")
+            finally:
+                futures.put(None)
+
+        threading.Thread(target=submit_all, daemon=True).start()
+        try:
+            while True:
+                item = futures.get()
+                if item is None:
+                    break
+                sentence, future = item
+                try:
+                    audio = future.result()
+                except (requests.exceptions.RequestException, KeyError, json.JSONDecodeError, ValueError) as e:
+                    log_message(f"Error during speech synthesis of '{sentence}': {e}")
+                    continue
+                log_message(f"Sentence ready: '{sentence}' ({audio.duration:.1f}s)")
+                yield audio
+        finally:
+            # Stop rendering sentences nobody will play (e.g. the caller bailed out)
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def synthesize_audio(self, text, filename=None):
+        """
+        Generates speech for `text` and returns it as PCMAudio decoded straight
+        from the response bytes, or None if synthesis fails. The WAV is also
+        written to `filename` if one is given.
+        """
+        if not text or not text.strip():
+            log_message("No text provided for speech synthesis.")
+            return None
+
+        log_message(f"Synthesizing speech for: '{text}'")
+        try:
+            wav_bytes = self._synthesize(text)
+            if filename:
+                with open(filename, "wb") as f:
+                    f.write(wav_bytes)
+                log_message(f"Speech saved to {filename}")
+            return decode_wav(wav_bytes)
+        except requests.exceptions.RequestException as e:
+            log_message(f"Error during speech synthesis: {e}")
+            return None
+        except (KeyError, json.JSONDecodeError, ValueError) as e:
+            log_message(f"Error processing VOICEVOX response: {e}")
+            return None
+
     def synthesize_speech(self, text, filename="output.wav"):
         """
         Generates speech audio from text using VOICEVOX and saves it to a file.
@@ -34,26 +226,11 @@ class VoicevoxHandler:
 
         log_message(f"Synthesizing speech for: '{text}'")
         try:
-            # 1. Get audio query
-            params = {"text": text, "speaker": self.speaker_id}
-            response = requests.post(
-                f"{self.base_url}/audio_query",
-                params=params
-            )
-            response.raise_for_status()
-            audio_query = response.json()
-
-            # 2. Synthesize audio
-            response = requests.post(
-                f"{self.base_url}/synthesis",
-                params={"speaker": self.speaker_id},
-                data=json.dumps(audio_query)
-            )
-            response.raise_for_status()
+            wav_bytes = self._synthesize(text)
 
-            # 3. Save audio to file
+            # Save audio to file
             with open(filename, "wb") as f:
-                f.write(response.content)
+                f.write(wav_bytes)
             
             log_message(f"Speech synthesized and saved to {filename}")
             return filename
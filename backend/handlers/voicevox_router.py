@@ -0,0 +1,153 @@
+# backend/handlers/voicevox_router.py
+
+import itertools
+import threading
+import requests
+from utils.logging_config import log_message
+from handlers.voicevox_client import VoicevoxClient
+
+class _Engine:
+    def __init__(self, url, client):
+        self.url = url
+        self.client = client
+        self.healthy = False
+        self.version = None
+        self.in_flight = 0
+        self.served = 0
+
+class VoicevoxRouter:
+    """
+    Spreads VOICEVOX requests over several engine instances.
+
+    Same interface as VoicevoxClient. A background thread probes every
+    engine's /version every `health_interval` seconds. Each synthesis goes
+    to the healthy engine with the fewest requests in flight (ties broken
+    by who served fewer), and a request that fails is retried on the next
+    best engine, with the failed one marked unhealthy until it passes a probe.
+    """
+    def __init__(self, urls, connect_timeout=3.0, read_timeout=30.0, pool_size=4, health_interval=10.0):
+        if isinstance(urls, str):
+            urls = [urls]
+        self.engines = [
+            _Engine(url, VoicevoxClient(url, connect_timeout, read_timeout, pool_size)) for url in urls
+        ]
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._order = itertools.count()
+        self._health_thread = None
+        self._speakers = set() # Re-initialized on every engine that comes (back) up
+
+    def start_health_checks(self):
+        """Starts the periodic background probe (idempotent)."""
+        if self._health_thread is None and self.health_interval:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+    def _health_loop(self):
+        while not self._stop_event.wait(self.health_interval):
+            self.check_health()
+
+    def check_health(self):
+        """Probes every engine once. Returns the number of healthy engines."""
+        for engine in self.engines:
+            try:
+                version = engine.client.version()
+            except requests.exceptions.RequestException as e:
+                if engine.healthy:
+                    log_message(f"VOICEVOX engine {engine.url} is down: {e}")
+                engine.healthy = False
+                continue
+            if not engine.healthy:
+                log_message(f"VOICEVOX engine {engine.url} is up (version: {version}).")
+                self._initialize_speakers(engine, self._speakers)
+            engine.version = version
+            engine.healthy = True
+        return sum(engine.healthy for engine in self.engines)
+
+    def _initialize_speakers(self, engine, speakers):
+        """Loads `speakers` on one engine. Returns False if any of them failed."""
+        ok = True
+        for speaker in sorted(speakers):
+            try:
+                engine.client.initialize_speaker(speaker)
+            except requests.exceptions.RequestException as e:
+                log_message(f"Could not initialize speaker {speaker} on {engine.url}: {e}")
+                ok = False
+        return ok
+
+    def initialize_speaker(self, speaker):
+        """
+        Loads `speaker` on every healthy engine, and on any engine that
+        recovers later. Returns the number of engines that loaded it.
+        """
+        self._speakers.add(speaker)
+        return sum(self._initialize_speakers(engine, [speaker]) for engine in self.engines if engine.healthy)
+
+    def version(self):
+        """Engine version of the healthy engines; warns if they differ."""
+        versions = {engine.version for engine in self.engines if engine.healthy}
+        if not versions:
+            raise requests.exceptions.ConnectionError("No healthy VOICEVOX engine.")
+        if len(versions) > 1:
+            log_message(f"VOICEVOX engines run different versions: {sorted(versions)}")
+        return sorted(versions)[0]
+
+    def _acquire(self, exclude):
+        """Picks the least-loaded healthy engine not in `exclude` and counts the request."""
+        with self._lock:
+            candidates = [e for e in self.engines if e.healthy and e not in exclude]
+            if not candidates:
+                # Probes may lag behind; an engine marked down is still worth a try
+                candidates = [e for e in self.engines if e not in exclude]
+            if not candidates:
+                return None
+            engine = min(candidates, key=lambda e: (e.in_flight, e.served, next(self._order)))
+            engine.in_flight += 1
+            return engine
+
+    def _release(self, engine):
+        with self._lock:
+            engine.in_flight -= 1
+            engine.served += 1
+
+    def _dispatch(self, method, *args, **kwargs):
+        tried = []
+        last_error = None
+        while True:
+            engine = self._acquire(tried)
+            if engine is None:
+                raise last_error or requests.exceptions.ConnectionError("No VOICEVOX engine configured.")
+            try:
+                result = getattr(engine.client, method)(*args, **kwargs)
+                engine.healthy = True
+                return result
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code < 500:
+                    raise # The request itself is bad; another engine would reject it too
+                last_error = e
+                tried.append(engine)
+                engine.healthy = False
+            except requests.exceptions.RequestException as e:
+                last_error = e
+                tried.append(engine)
+                if engine.healthy:
+                    log_message(f"VOICEVOX engine {engine.url} failed ({e}); failing over.")
+                engine.healthy = False
+            finally:
+                self._release(engine)
+
+    def audio_query(self, text, speaker):
+        return self._dispatch("audio_query", text, speaker)
+
+    def synthesis(self, audio_query, speaker):
+        return self._dispatch("synthesis", audio_query, speaker)
+
+    def synthesize(self, text, speaker, query_overrides=None):
+        """audio_query + synthesis on one engine, failing over as a unit."""
+        return self._dispatch("synthesize", text, speaker, query_overrides)
+
+    def close(self):
+        self._stop_event.set()
+        for engine in self.engines:
+            engine.client.close()
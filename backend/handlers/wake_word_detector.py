@@ -0,0 +1,92 @@
+# backend/handlers/wake_word_detector.py
+
+import glob
+import os
+import threading
+import numpy as np
+import soundfile as sf
+import whisper
+from utils.logging_config import log_message
+from utils.audio_features import mfcc, dtw_distance
+
+class WakeWordDetector:
+    """
+    Cheap keyword-spotting stage that runs before full Whisper transcription.
+
+    method="whisper_tiny": a single greedy decode of the first `window_duration`
+        seconds with the tiny Whisper model; fires if any keyword appears.
+    method="template": MFCC + subsequence DTW against enrolled WAV recordings
+        of the wake word (one file per example in `template_dir`). No neural
+        network is involved at all.
+    """
+    def __init__(self, sample_rate, keywords, method="whisper_tiny", window_duration=1.5,
+                 tiny_model_name="tiny", template_dir=None, template_threshold=12.0):
+        self.sample_rate = sample_rate
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.method = method
+        self.window_samples = int(window_duration * sample_rate)
+        self.template_threshold = template_threshold
+        self.tiny_model = None
+        self.templates = []
+        self._lock = threading.Lock() # The tiny model is not safe to decode concurrently
+
+        if method == "whisper_tiny":
+            log_message(f"Loading wake word model: {tiny_model_name}...")
+            self.tiny_model = whisper.load_model(tiny_model_name)
+            log_message("Wake word model loaded.")
+        elif method == "template":
+            self.templates = self._load_templates(template_dir)
+            if not self.templates:
+                raise ValueError(f"No wake word templates found in {template_dir}.")
+        else:
+            raise ValueError(f"Unknown wake word method: {method}")
+
+    def _load_templates(self, template_dir):
+        """Loads and featurizes every WAV file in template_dir."""
+        templates = []
+        for path in sorted(glob.glob(os.path.join(template_dir or "", "*.wav"))):
+            data, samplerate = sf.read(path, dtype="float32", always_2d=True)
+            if samplerate != self.sample_rate:
+                log_message(f"Skipping wake word template {path}: {samplerate} Hz (expected {self.sample_rate} Hz).")
+                continue
+            templates.append(self._features(data.mean(axis=1)))
+        log_message(f"Loaded {len(templates)} wake word templates.")
+        return templates
+
+    def _features(self, samples):
+        features = mfcc(samples, self.sample_rate)
+        return features - features.mean(axis=0) # Cepstral mean normalization
+
+    def detect(self, audio):
+        """Returns True if the wake word is heard at the start of `audio` (mono float32)."""
+        window = audio[:self.window_samples]
+        if window.size == 0:
+            return False
+        try:
+            if self.method == "whisper_tiny":
+                text = self._decode_tiny(window)
+                detected = any(keyword in text.lower() for keyword in self.keywords)
+                log_message(f"Wake word check (tiny): '{text}' -> {detected}")
+            else:
+                query = self._features(window)
+                distance = min(dtw_distance(template, query, subsequence=True) for template in self.templates)
+                detected = distance < self.template_threshold
+                log_message(f"Wake word check (template): distance={distance:.2f} -> {detected}")
+            return detected
+        except Exception as e:
+            # Never lose a request because the cheap stage failed
+            log_message(f"Error during wake word detection: {e}")
+            return True
+
+    def _decode_tiny(self, window):
+        """One greedy decode pass, without temperature fallback or timestamps."""
+        audio = whisper.pad_or_trim(window.astype(np.float32))
+        mel = whisper.log_mel_spectrogram(audio, self.tiny_model.dims.n_mels).to(self.tiny_model.device)
+        options = whisper.DecodingOptions(language="ja", without_timestamps=True, fp16=False)
+        with self._lock:
+            result = whisper.decode(self.tiny_model, mel, options)
+        return result.text
+
+    def warm_up(self):
+        """Runs one detection on silence so the first real check is not the slow one."""
+        self.detect(np.zeros(self.window_samples, dtype=np.float32))
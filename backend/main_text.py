@@ -4,9 +4,6 @@ import sys
 import threading
 import time
 import datetime
-import os
-import sounddevice as sd
-import soundfile as sf
 
 # Import configurations and handlers
 import config
@@ -14,20 +11,9 @@ from utils.logging_config import log_message, print_separator
 from handlers.gemini_handler import GeminiHandler
 from handlers.voicevox_handler import VoicevoxHandler
 from handlers.database_handler import DatabaseHandler
-
-def play_audio(audio_path):
-    """Plays an audio file using sounddevice."""
-    if not audio_path or not os.path.exists(audio_path):
-        log_message("再生する音声ファイルが見つかりません。")
-        return
-    log_message(f"Playing audio from {audio_path}...")
-    try:
-        data, samplerate = sf.read(audio_path)
-        sd.play(data, samplerate)
-        sd.wait()
-        log_message("Audio playback finished.")
-    except Exception as e:
-        log_message(f"Error playing audio: {e}")
+from handlers.conversation_memory import create_conversation_memory
+from handlers.playback_engine import PlaybackEngine
+from utils.warmup import WarmUp
 
 class SayoTextApplication:
     def __init__(self):
@@ -37,13 +23,51 @@ class SayoTextApplication:
             self.gemini_handler = GeminiHandler(
                 api_key=config.GEMINI_API_KEY,
                 model_name=config.GEMINI_MODEL_NAME,
-                system_instruction=config.SYSTEM_INSTRUCTION
+                system_instruction=config.SYSTEM_INSTRUCTION,
+                context_cache_ttl=config.GEMINI_CONTEXT_CACHE_TTL
             )
             self.voicevox_handler = VoicevoxHandler(
-                base_url=config.VOICEVOX_URL,
-                speaker_id=config.SPEAKER_ID
+                base_url=config.VOICEVOX_URLS,
+                speaker_id=config.SPEAKER_ID,
+                max_parallel_synthesis=config.TTS_MAX_PARALLEL,
+                cache_dir=config.TTS_CACHE_DIR,
+                cache_max_bytes=config.TTS_CACHE_MAX_MB * 1024 * 1024,
+                cache_memory_items=config.TTS_CACHE_MEMORY_ITEMS,
+                connect_timeout=config.VOICEVOX_CONNECT_TIMEOUT,
+                read_timeout=config.VOICEVOX_READ_TIMEOUT,
+                health_interval=config.VOICEVOX_HEALTH_INTERVAL
+            )
+            self.db_handler = DatabaseHandler(db_path=config.DB_PATH, recent_turns=config.DB_RECENT_TURNS)
+            # Recent turns verbatim plus a running summary of older ones, both kept in the database,
+            # and older exchanges related to each prompt from the long-term memory index
+            self.memory = create_conversation_memory(
+                self.db_handler,
+                summarize=self.gemini_handler.summarize if config.GEMINI_SUMMARY_TOKEN_BUDGET else None,
+                recent_token_budget=config.GEMINI_HISTORY_TOKEN_BUDGET,
+                summary_token_budget=config.GEMINI_SUMMARY_TOKEN_BUDGET,
+                index_path=config.MEMORY_INDEX_PATH,
+                recall_k=config.MEMORY_RECALL_TOP_K,
+                recall_min_score=config.MEMORY_RECALL_MIN_SCORE
             )
-            self.db_handler = DatabaseHandler(db_path=config.DB_PATH)
+            self.gemini_handler.memory = self.memory
+            # Speech plays in the background while the next message is typed
+            self.player = PlaybackEngine(sample_rate=config.PLAYBACK_SAMPLE_RATE,
+                                         block_size=config.PLAYBACK_BLOCK_SIZE)
+
+            # Fixed replies, rendered into the TTS cache
+            prerender_phrases = config.TTS_PRERENDER_PHRASES + [GeminiHandler.ERROR_RESPONSE]
+
+            # Connections warm up in the background while the prompt appears;
+            # the TTS cache fills once the speaker is loaded
+            self.warmup = None
+            if config.WARMUP_ENABLED:
+                self.player.start()
+                self.warmup = WarmUp([
+                    ("VOICEVOX speaker", lambda: self.voicevox_handler.warm_up(prerender_phrases)),
+                    ("Gemini connection", self.gemini_handler.warm_up),
+                ])
+            else:
+                self.voicevox_handler.start_prerender(prerender_phrases)
             
             # Application state
             self.is_running = True
@@ -55,6 +79,55 @@ class SayoTextApplication:
             log_message(f"An unexpected error occurred during initialization: {e}")
             sys.exit(1)
 
+    def _reply(self, user_input, save_prefix):
+        """Waits for the whole reply, shows it, then synthesizes and queues it."""
+        gemini_response_text = self.gemini_handler.think(user_input)
+        
+        # 小夜の応答を直接表示
+        print(f"小夜 > {gemini_response_text}")
+
+        if gemini_response_text:
+            log_message(">>> [LOG] VOICEVOX送信中...")
+            if config.TTS_STREAMING:
+                # Play each sentence as soon as it is ready
+                for sentence_audio in self.voicevox_handler.synthesize_audio_stream(gemini_response_text, filename_prefix=save_prefix):
+                    log_message(">>> [LOG] 音声再生中...")
+                    self.player.enqueue(sentence_audio)
+            else:
+                synthesized_audio = self.voicevox_handler.synthesize_audio(
+                    gemini_response_text, filename=f"{save_prefix}.wav" if save_prefix else None
+                )
+                if synthesized_audio:
+                    log_message(">>> [LOG] 音声再生中...")
+                    self.player.enqueue(synthesized_audio)
+        return gemini_response_text
+
+    def _stream_reply(self, user_input, save_prefix):
+        """
+        Prints the reply as it is generated and queues each sentence for
+        playback as soon as it is complete and synthesized.
+        """
+        parts = []
+        def show(deltas):
+            # 小夜の応答を直接表示
+            print("小夜 > ", end="", flush=True)
+            for delta in deltas:
+                parts.append(delta)
+                print(delta, end="", flush=True)
+                yield delta
+            print()
+
+        start = time.perf_counter()
+        first = True
+        deltas = show(self.gemini_handler.think(user_input, stream=True))
+        for sentence_audio in self.voicevox_handler.synthesize_text_stream(deltas, filename_prefix=save_prefix):
+            if first:
+                first = False
+                log_message(f">>> [LOG] First audio {time.perf_counter() - start:.2f}s after input.")
+            log_message(">>> [LOG] 音声再生中...")
+            self.player.enqueue(sentence_audio)
+        return "".join(parts)
+
     # Note: Text mode does not use scheduled announcements by default, 
     # but the logic is kept for consistency if needed later.
     # For this reproduction, we will not run a scheduler by default.
@@ -77,23 +150,21 @@ class SayoTextApplication:
                 if not user_input:
                     continue
 
+                # A new message cuts off whatever Sayo is still saying
+                self.player.stop()
+
                 if config.IS_MAKER_MODE:
                     log_message("\n--- [PROCESS START] ---")
                 
-                gemini_response_text = self.gemini_handler.think(user_input)
-                
-                # 小夜の応答を直接表示
-                print(f"小夜 > {gemini_response_text}")
+                save_prefix = f"{config.SYNTHESIZED_AUDIO_PREFIX}_text" if config.SAVE_SYNTHESIZED_AUDIO else None
+                if config.GEMINI_STREAMING and config.TTS_STREAMING:
+                    # Show and speak the reply while Gemini is still generating it
+                    gemini_response_text = self._stream_reply(user_input, save_prefix)
+                else:
+                    gemini_response_text = self._reply(user_input, save_prefix)
 
                 # Log the conversation to DB
-                self.db_handler.log_conversation(user_input, gemini_response_text)
-
-                if gemini_response_text:
-                    log_message(">>> [LOG] VOICEVOX送信中...")
-                    synthesized_audio_path = self.voicevox_handler.synthesize_speech(gemini_response_text, filename="output_text.wav")
-                    if synthesized_audio_path:
-                        log_message(">>> [LOG] 音声再生中...")
-                        play_audio(synthesized_audio_path)
+                self.memory.add_turn(user_input, gemini_response_text)
                 
                 if config.IS_MAKER_MODE:
                     log_message("--- [PROCESS END] ---")
@@ -106,6 +177,9 @@ class SayoTextApplication:
                 log_message(f"An error occurred in main loop: {e}")
                 self.is_running = False
 
+        self.player.close()
+        self.memory.close()
+        self.db_handler.close()
         log_message("Sayo is offline.")
 
 def main():
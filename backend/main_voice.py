@@ -10,15 +10,33 @@ import datetime
 import config
 from utils.logging_config import log_message
 from handlers.audio_handler import AudioHandler
+from handlers.wake_word_detector import WakeWordDetector
+from handlers.vad import create_vad
 from handlers.gemini_handler import GeminiHandler
 from handlers.voicevox_handler import VoicevoxHandler
 from handlers.database_handler import DatabaseHandler
+from handlers.conversation_memory import create_conversation_memory
+from utils.warmup import WarmUp
 
 class SayoApplication:
+    EXIT_WORDS = ["exit", "終了", "しゅうりょう", "エグジット", "イグジット"]
+
     def __init__(self):
         log_message("Initializing Sayo...")
         try:
             # Load handlers
+            wake_word_detector = None
+            if config.WAKE_WORD_ENABLED:
+                wake_word_detector = WakeWordDetector(
+                    sample_rate=config.SAMPLE_RATE,
+                    # Exit commands must still get through while not activated
+                    keywords=config.WAKE_WORDS + self.EXIT_WORDS,
+                    method=config.WAKE_WORD_METHOD,
+                    window_duration=config.WAKE_WORD_WINDOW,
+                    tiny_model_name=config.WAKE_WORD_TINY_MODEL,
+                    template_dir=config.WAKE_WORD_TEMPLATE_DIR,
+                    template_threshold=config.WAKE_WORD_TEMPLATE_THRESHOLD
+                )
             self.audio_handler = AudioHandler(
                 whisper_model_name=config.WHISPER_MODEL_NAME,
                 sample_rate=config.SAMPLE_RATE,
@@ -26,22 +44,93 @@ class SayoApplication:
                 chunk_size=config.CHUNK_SIZE,
                 silence_threshold=config.SILENCE_THRESHOLD,
                 silence_duration=config.SILENCE_DURATION,
-                max_record_duration=config.MAX_RECORD_DURATION
+                max_record_duration=config.MAX_RECORD_DURATION,
+                pre_roll_duration=config.PRE_ROLL_DURATION,
+                streaming_asr=config.STREAMING_ASR,
+                streaming_step_duration=config.STREAMING_ASR_STEP,
+                streaming_max_window=config.STREAMING_ASR_MAX_WINDOW,
+                wake_word_detector=wake_word_detector,
+                trim_margin=config.TRIM_MARGIN,
+                segment_max_duration=config.SEGMENT_MAX_DURATION,
+                segment_min_pause=config.SEGMENT_MIN_PAUSE,
+                asr_parallel_segments=config.ASR_PARALLEL_SEGMENTS,
+                playback_sample_rate=config.PLAYBACK_SAMPLE_RATE,
+                playback_block_size=config.PLAYBACK_BLOCK_SIZE,
+                barge_in=config.BARGE_IN_ENABLED,
+                barge_in_ratio=config.BARGE_IN_RATIO,
+                echo_suppression=config.ECHO_SUPPRESSION_ENABLED,
+                echo_max_delay=config.ECHO_MAX_DELAY,
+                echo_correlation_threshold=config.ECHO_CORRELATION_THRESHOLD,
+                echo_max_double_talk=config.ECHO_MAX_DOUBLE_TALK,
+                vad=create_vad(config.VAD_TYPE, config.SAMPLE_RATE, config.CHUNK_SIZE, config.SILENCE_THRESHOLD),
+                asr_backend=config.ASR_BACKEND,
+                asr_compute_type=config.ASR_COMPUTE_TYPE,
+                asr_cpu_threads=config.ASR_CPU_THREADS,
+                cascade_gate_model_name=config.ASR_CASCADE_GATE_MODEL if config.ASR_CASCADE_ENABLED else None,
+                cascade_options={
+                    # A bare hotword or exit command never needs the large model
+                    "accept_phrases": config.WAKE_WORDS + self.EXIT_WORDS,
+                    "min_avg_logprob": config.ASR_CASCADE_MIN_AVG_LOGPROB,
+                    "max_no_speech_prob": config.ASR_CASCADE_MAX_NO_SPEECH_PROB,
+                    "reject_no_speech_prob": config.ASR_CASCADE_REJECT_NO_SPEECH_PROB,
+                }
             )
             self.gemini_handler = GeminiHandler(
                 api_key=config.GEMINI_API_KEY,
                 model_name=config.GEMINI_MODEL_NAME,
-                system_instruction=config.SYSTEM_INSTRUCTION
+                system_instruction=config.SYSTEM_INSTRUCTION,
+                context_cache_ttl=config.GEMINI_CONTEXT_CACHE_TTL
             )
             self.voicevox_handler = VoicevoxHandler(
-                base_url=config.VOICEVOX_URL,
-                speaker_id=config.SPEAKER_ID
+                base_url=config.VOICEVOX_URLS,
+                speaker_id=config.SPEAKER_ID,
+                max_parallel_synthesis=config.TTS_MAX_PARALLEL,
+                cache_dir=config.TTS_CACHE_DIR,
+                cache_max_bytes=config.TTS_CACHE_MAX_MB * 1024 * 1024,
+                cache_memory_items=config.TTS_CACHE_MEMORY_ITEMS,
+                connect_timeout=config.VOICEVOX_CONNECT_TIMEOUT,
+                read_timeout=config.VOICEVOX_READ_TIMEOUT,
+                health_interval=config.VOICEVOX_HEALTH_INTERVAL
+            )
+            self.db_handler = DatabaseHandler(db_path=config.DB_PATH, recent_turns=config.DB_RECENT_TURNS)
+            # Recent turns verbatim plus a running summary of older ones, both kept in the database,
+            # and older exchanges related to each prompt from the long-term memory index
+            self.memory = create_conversation_memory(
+                self.db_handler,
+                summarize=self.gemini_handler.summarize if config.GEMINI_SUMMARY_TOKEN_BUDGET else None,
+                recent_token_budget=config.GEMINI_HISTORY_TOKEN_BUDGET,
+                summary_token_budget=config.GEMINI_SUMMARY_TOKEN_BUDGET,
+                index_path=config.MEMORY_INDEX_PATH,
+                recall_k=config.MEMORY_RECALL_TOP_K,
+                recall_min_score=config.MEMORY_RECALL_MIN_SCORE
             )
-            self.db_handler = DatabaseHandler(db_path=config.DB_PATH)
+            self.gemini_handler.memory = self.memory
+
+            # Fixed replies and the hourly announcements, rendered into the TTS cache
+            prerender_phrases = config.TTS_PRERENDER_PHRASES + [GeminiHandler.ERROR_RESPONSE]
+            prerender_phrases += [f"{hour}時です" for hour in range(24)]
+
+            # Models and connections warm up in the background while the main
+            # loop starts; the TTS cache fills once the speaker is loaded
+            self.warmup = None
+            if config.WARMUP_ENABLED:
+                self.audio_handler.open_streams()
+                self.warmup = WarmUp([
+                    ("speech recognition", self.audio_handler.warm_up),
+                    ("VOICEVOX speaker", lambda: self.voicevox_handler.warm_up(prerender_phrases)),
+                    ("Gemini connection", self.gemini_handler.warm_up),
+                ])
+            else:
+                self.voicevox_handler.start_prerender(prerender_phrases)
             
             # Application state
             self.is_running = True
             self.sayo_activated = False
+            self.hotword_heard = False # Set early from partial transcripts
+            # The thread speaking the previous reply (barge-in mode) and the
+            # number of the current turn; a reply stops once the turn moves on
+            self._responder = None
+            self._turn = 0
 
         except (ValueError, ConnectionError) as e:
             log_message(f"Failed to initialize Sayo: {e}")
@@ -56,11 +145,11 @@ class SayoApplication:
         time_text = f"{now.hour}時です"
         log_message(f"Announcing time: {time_text}")
         try:
-            # Use a different filename for time to avoid conflicts
-            time_audio_path = self.voicevox_handler.synthesize_speech(
-                time_text, filename="time.wav"
-            )
-            self.audio_handler.play_audio(time_audio_path)
+            # Decoded in memory, so it cannot clash with a response being played
+            time_audio = self.voicevox_handler.synthesize_audio(time_text)
+            if time_audio:
+                # Queued behind anything Sayo is currently saying
+                self.audio_handler.play_audio(time_audio, block=False)
         except Exception as e:
             log_message(f"Error during time announcement: {e}")
 
@@ -73,13 +162,122 @@ class SayoApplication:
 
     def _handle_spoken_exit(self, text):
         """Checks for spoken exit commands."""
-        exit_words = ["exit", "終了", "しゅうりょう", "エグジット", "イグジット"]
-        if any(word in text.lower() for word in exit_words):
+        if any(word in text.lower() for word in self.EXIT_WORDS):
             log_message("Spoken exit command recognized. Shutting down...")
             self.is_running = False
             return True
         return False
 
+    def _should_reject(self, recognition):
+        """
+        Drops transcripts that are most likely not speech (fan noise, TV,
+        Whisper hallucinations) before any Gemini or VOICEVOX call.
+        """
+        if not config.REJECTION_ENABLED:
+            return False
+        reason = None
+        if recognition.compression_ratio > config.REJECT_COMPRESSION_RATIO:
+            reason = "repetitive transcript"
+        elif recognition.no_speech_prob > config.REJECT_NO_SPEECH_PROB and recognition.avg_logprob < config.REJECT_AVG_LOGPROB:
+            reason = "no speech"
+        elif recognition.avg_logprob < config.REJECT_MIN_AVG_LOGPROB:
+            reason = "low confidence"
+        if reason:
+            log_message(f">>> [LOG] Rejected transcript ({reason}; {recognition.describe()}): {recognition.text}")
+            return True
+        return False
+
+    def _has_wake_word(self, text):
+        """True if `text` contains any of config.WAKE_WORDS (e.g. さよ or 小夜)."""
+        text = text.lower()
+        return any(word.lower() in text for word in config.WAKE_WORDS)
+
+    def _on_partial_transcript(self, committed_text, tentative_text):
+        """Receives partial hypotheses while the user is still talking."""
+        log_message(f">>> [Whisper] (partial) {committed_text}|{tentative_text}")
+        if not self.sayo_activated and not self.hotword_heard and self._has_wake_word(committed_text):
+            self.hotword_heard = True
+            log_message(">>> [LOG] Hotword heard in partial transcript.")
+
+    def _speak(self, response, cancelled):
+        """
+        Synthesizes `response` and queues it for playback (decoded in memory;
+        files only when debugging). `response` is either text or a stream of
+        Gemini text deltas, whose sentences are synthesized as they arrive.
+        Stops early once `cancelled()` returns True.
+        """
+        save_prefix = config.SYNTHESIZED_AUDIO_PREFIX if config.SAVE_SYNTHESIZED_AUDIO else None
+        if not isinstance(response, str):
+            audio_stream = self.voicevox_handler.synthesize_text_stream(response, filename_prefix=save_prefix)
+        elif config.TTS_STREAMING:
+            # Play each sentence as soon as it is ready
+            audio_stream = self.voicevox_handler.synthesize_audio_stream(response, filename_prefix=save_prefix)
+        else:
+            synthesized_audio = self.voicevox_handler.synthesize_audio(
+                response, filename=f"{save_prefix}.wav" if save_prefix else None
+            )
+            audio_stream = [synthesized_audio] if synthesized_audio else []
+
+        first = True
+        for sentence_audio in audio_stream:
+            if cancelled():
+                log_message(">>> [LOG] Interrupted; dropping the rest of the response.")
+                break
+            if first:
+                first = False
+                latency = time.monotonic() - self.audio_handler.speech_end_time
+                log_message(f">>> [LOG] First audio {latency:.2f}s after the end of speech.")
+            self.audio_handler.play_audio(sentence_audio, block=False)
+
+    def _respond(self, user_text, response, log_turn, turn):
+        """
+        Speaks `response` (text or Gemini text deltas), then logs what was
+        said. Stops when the user barges in or turn `turn` is over; a
+        Gemini stream is then closed, and the part generated so far is logged.
+        """
+        barge_in_count = self.audio_handler.barge_in_count
+        def cancelled():
+            return self._turn != turn or self.audio_handler.barge_in_count != barge_in_count
+
+        if isinstance(response, str):
+            response_text = response
+            self._speak(response, cancelled)
+        else:
+            parts = []
+            collected = threading.Event()
+            def collect(deltas):
+                # Runs on the synthesis feeder thread, which pulls the deltas
+                try:
+                    for delta in deltas:
+                        if cancelled():
+                            break
+                        parts.append(delta)
+                        yield delta
+                finally:
+                    deltas.close()
+                    collected.set()
+            self._speak(collect(response), cancelled)
+            collected.wait() # If interrupted, until the next delta arrives
+            response_text = "".join(parts)
+
+        log_message(f">>> [Gemini] Responded: {response_text}")
+        # Log conversation if it was a meaningful interaction
+        if log_turn and response_text:
+            self.memory.add_turn(user_text, response_text)
+
+    def _cancel_response(self):
+        """
+        Stops the previous reply if it is still being generated or spoken,
+        and waits until it has been logged, so the next prompt includes it.
+        """
+        self._turn += 1
+        responder = self._responder
+        if responder is None or not responder.is_alive():
+            return
+        log_message(">>> [LOG] New turn; cancelling the previous response.")
+        self.audio_handler.stop_playback()
+        responder.join()
+
     def run(self):
         """Main application loop."""
         log_message("\nSayo is ready. 話しかけてください。")
@@ -90,19 +288,24 @@ class SayoApplication:
         scheduler_thread.start()
 
         while self.is_running:
-            recorded_path = self.audio_handler.listen_and_record()
+            self.hotword_heard = False
+            recognition = self.audio_handler.listen_and_recognize(
+                on_partial=self._on_partial_transcript,
+                output_filename=config.RECORDED_AUDIO_PATH if config.SAVE_RECORDED_AUDIO else None,
+                require_wake_word=not self.sayo_activated
+            )
 
-            if recorded_path == "EXIT":
+            if recognition == "EXIT":
                 log_message("Exit command typed. Shutting down...")
                 self.is_running = False
                 break
             
-            if not recorded_path:
+            if recognition is None:
                 print("######")
                 continue
 
             log_message("\n--- [PROCESS START] ---")
-            user_text = self.audio_handler.recognize_speech(recorded_path)
+            user_text = recognition.text
             log_message(f">>> [Whisper] Recognized: {user_text}")
 
             if not user_text.strip():
@@ -114,38 +317,54 @@ class SayoApplication:
             if self._handle_spoken_exit(user_text):
                 break
 
-            response_text = ""
+            if self._should_reject(recognition):
+                log_message("--- [PROCESS END] ---")
+                print("######")
+                continue
+
+            # This is a new turn: whatever Sayo was still saying is over
+            self._cancel_response()
+            # Text, or a stream of text deltas that is spoken while it is generated
+            stream = config.GEMINI_STREAMING and config.TTS_STREAMING
+            response = ""
             if self.sayo_activated:
                 # If already active, process any speech
                 log_message(f">>> [LOG] Processing (active): {user_text}")
-                response_text = self.gemini_handler.think(user_text)
+                response = self.gemini_handler.think(user_text, stream=stream)
             else:
                 # Check for hotword to activate
-                hotword_detected = "さよ" in user_text.lower() or "さよち" in user_text.lower()
+                hotword_detected = self.hotword_heard or self._has_wake_word(user_text)
                 log_message(f">>> [LOG] Hotword check: {hotword_detected}")
                 if hotword_detected:
                     self.sayo_activated = True
                     # Use the full text including the hotword for the first response
-                    response_text = self.gemini_handler.think(user_text)
+                    response = self.gemini_handler.think(user_text, stream=stream)
                 else:
                     # Not activated, prompt user to call Sayo
                     log_message(">>> [LOG] Hotword not detected. Prompting user.")
-                    response_text = "小夜にご用ですか？"
-
-            log_message(f">>> [Gemini] Responded: {response_text}")
+                    response = "小夜にご用ですか？"
 
-            if response_text:
-                # Log conversation if it was a meaningful interaction
-                if self.sayo_activated:
-                     self.db_handler.log_conversation(user_text, response_text)
-                
-                # Synthesize and play response
-                synthesized_path = self.voicevox_handler.synthesize_speech(response_text)
-                self.audio_handler.play_audio(synthesized_path)
+            if response:
+                if config.BARGE_IN_ENABLED:
+                    # Speak in the background and go straight back to listening;
+                    # talking over Sayo stops her (see AudioHandler barge-in)
+                    self._responder = threading.Thread(
+                        target=self._respond, args=(user_text, response, self.sayo_activated, self._turn), daemon=True)
+                    self._responder.start()
+                else:
+                    self._respond(user_text, response, self.sayo_activated, self._turn)
+                    # The mic would pick up Sayo's own voice, so listen again once she is done
+                    self.audio_handler.wait_playback()
 
             log_message("--- [PROCESS END] ---")
             print("######")
 
+        self._cancel_response()
+        self.audio_handler.close()
+        self.memory.close()
+        self.db_handler.close()
+        if self.audio_handler.echo_suppressor is not None:
+            log_message(f"ASR calls avoided by echo suppression: {self.audio_handler.asr_calls_avoided}")
         log_message("Sayo is shutting down.")
 
 def main():
@@ -2,13 +2,13 @@ import os
 import time
 import threading
 import queue
-import json
 import datetime
 import requests
 import google.generativeai as genai
 import sys
 import sqlite3
 from dotenv import load_dotenv
+from handlers.voicevox_client import VoicevoxClient
 import sounddevice as sd
 import soundfile as sf
 
@@ -18,6 +18,10 @@ load_dotenv() # Load environment variables from .env file
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY") # Tavily API Key
 VOICEVOX_URL = "http://127.0.0.1:50021"
+VOICEVOX_CONNECT_TIMEOUT = 3.0 # 接続タイムアウト（秒）
+VOICEVOX_READ_TIMEOUT = 30.0 # 応答待ちタイムアウト（秒）。エンジンが固まっても起動や会話ループを止めない
+voicevox_client = VoicevoxClient(VOICEVOX_URL, connect_timeout=VOICEVOX_CONNECT_TIMEOUT,
+                                 read_timeout=VOICEVOX_READ_TIMEOUT)
 SPEAKER_ID = 46  # 小夜/Sayo
 DB_PATH = "sayo_log.db"
 GEMINI_MODEL_NAME = "gemini-2.5-flash-lite"
@@ -169,10 +173,8 @@ def initialize_sayo():
 
     # Check VOICEVOX availability
     try:
-        response = requests.get(f"{VOICEVOX_URL}/version")
-        response.raise_for_status()
-        log_message(f"VOICEVOX is running (version: {response.json()}).")
-    except requests.exceptions.ConnectionError:
+        log_message(f"VOICEVOX is running (version: {voicevox_client.version()}).")
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
         raise ConnectionError(f"VOICEVOX is not running on {VOICEVOX_URL}. Please start the application.")
     except Exception as e:
         log_message(f"Error checking VOICEVOX: {e}")
@@ -256,33 +258,12 @@ def synthesize_speech(text, speaker_id=SPEAKER_ID, filename="output.wav"):
         log_message("合成するテキストがありません。")
         return None
     log_message(f"Synthesizing speech for: {text}")
-    params = {
-        "text": text,
-        "speaker": speaker_id,
-    }
-    headers = {"Content-Type": "application/json"}
+    # Shared keep-alive session with timeouts (see handlers/voicevox_client.py)
+    wav_bytes = voicevox_client.synthesize(text, speaker_id)
 
-    # Get audio query
-    response = requests.post(
-        f"{VOICEVOX_URL}/audio_query",
-        headers=headers,
-        params={"text": text, "speaker": speaker_id}
-    )
-    response.raise_for_status()
-    audio_query = response.json()
-
-    # Synthesize audio
-    response = requests.post(
-        f"{VOICEVOX_URL}/synthesis",
-        headers=headers,
-        params={"speaker": speaker_id},
-        data=json.dumps(audio_query)
-    )
-    response.raise_for_status()
-    
     # Save audio to a file
     with open(filename, "wb") as f:
-        f.write(response.content)
+        f.write(wav_bytes)
     log_message(f"Speech synthesized and saved to {filename}")
     return filename
 
@@ -2,7 +2,6 @@ import os
 import time
 import threading
 import queue
-import json
 import datetime
 import requests
 import numpy as np
@@ -16,12 +15,17 @@ import sys
 import sqlite3
 import select
 from dotenv import load_dotenv
+from handlers.voicevox_client import VoicevoxClient
 
 load_dotenv() # Load environment variables from .env file
 
 # --- Configuration ---
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 VOICEVOX_URL = "http://127.0.0.1:50021"
+VOICEVOX_CONNECT_TIMEOUT = 3.0 # 接続タイムアウト（秒）
+VOICEVOX_READ_TIMEOUT = 30.0 # 応答待ちタイムアウト（秒）。エンジンが固まっても起動や会話ループを止めない
+voicevox_client = VoicevoxClient(VOICEVOX_URL, connect_timeout=VOICEVOX_CONNECT_TIMEOUT,
+                                 read_timeout=VOICEVOX_READ_TIMEOUT)
 SPEAKER_ID = 46  # 小夜/Sayo
 SAMPLE_RATE = 16000 # Whisperは16k推奨
 SILENCE_THRESHOLD = 0.02 # マイクの無音判定閾値 (RMS値)
@@ -204,10 +208,8 @@ def initialize_sayo():
 
     # Check VOICEVOX availability
     try:
-        response = requests.get(f"{VOICEVOX_URL}/version")
-        response.raise_for_status()
-        log_message(f"VOICEVOX is running (version: {response.json()}).")
-    except requests.exceptions.ConnectionError:
+        log_message(f"VOICEVOX is running (version: {voicevox_client.version()}).")
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
         raise ConnectionError(f"VOICEVOX is not running on {VOICEVOX_URL}. Please start the application.")
     except Exception as e:
         log_message(f"Error checking VOICEVOX: {e}")
@@ -242,33 +244,12 @@ def synthesize_speech(text, speaker_id=SPEAKER_ID, filename="output.wav"):
         log_message("合成するテキストがありません。")
         return None
     log_message(f"Synthesizing speech for: {text}")
-    params = {
-        "text": text,
-        "speaker": speaker_id,
-    }
-    headers = {"Content-Type": "application/json"}
-
-    # Get audio query
-    response = requests.post(
-        f"{VOICEVOX_URL}/audio_query",
-        headers=headers,
-        params={"text": text, "speaker": speaker_id}
-    )
-    response.raise_for_status()
-    audio_query = response.json()
-
-    # Synthesize audio
-    response = requests.post(
-        f"{VOICEVOX_URL}/synthesis",
-        headers=headers,
-        params={"speaker": speaker_id},
-        data=json.dumps(audio_query)
-    )
-    response.raise_for_status()
-    
+    # Shared keep-alive session with timeouts (see handlers/voicevox_client.py)
+    wav_bytes = voicevox_client.synthesize(text, speaker_id)
+
     # Save audio to a file
     with open(filename, "wb") as f:
-        f.write(response.content)
+        f.write(wav_bytes)
     log_message(f"Speech synthesized and saved to {filename}")
     return filename
 
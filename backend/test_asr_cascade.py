@@ -0,0 +1,53 @@
+"""
+Checks which gate results CascadeASR keeps and which it sends to the full
+model. No Whisper model is needed: both tiers are fixed results.
+
+    python -m pytest test_asr_cascade.py
+"""
+from handlers.asr_cascade import CascadeASR
+
+class FixedBackend:
+    supports_concurrency = True
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        return self.result
+
+def gate_result(text, no_speech_prob, avg_logprob):
+    return {"text": text, "segments": [{"text": text, "no_speech_prob": no_speech_prob, "avg_logprob": avg_logprob}]}
+
+def run_cascade(gate):
+    full = FixedBackend(gate_result("フルモデルの結果", 0.0, -0.1))
+    cascade = CascadeASR(FixedBackend(gate), full, accept_phrases=["さよ", "終了"],
+                         min_avg_logprob=-0.5, max_no_speech_prob=0.3, reject_no_speech_prob=0.8)
+    result = cascade.transcribe(None, language="ja")
+    return result["text"], full.calls
+
+def test_confident_transcript_is_kept():
+    assert run_cascade(gate_result("今日の天気は？", 0.05, -0.2)) == ("今日の天気は？", 0)
+
+def test_unsure_transcript_is_escalated():
+    assert run_cascade(gate_result("今日の天気は？", 0.05, -0.9)) == ("フルモデルの結果", 1)
+
+def test_hotword_only_is_kept():
+    assert run_cascade(gate_result("さよ。", 0.2, -1.2)) == ("さよ。", 0)
+
+def test_empty_transcript_with_high_no_speech_prob_is_kept():
+    assert run_cascade(gate_result("", 0.9, -1.0)) == ("", 0)
+
+def test_empty_transcript_with_low_no_speech_prob_is_escalated():
+    assert run_cascade(gate_result("", 0.1, -1.0)) == ("フルモデルの結果", 1)
+
+def test_missing_segments_are_escalated():
+    assert run_cascade({"text": "", "segments": []}) == ("フルモデルの結果", 1)
+
+def test_confident_text_with_high_no_speech_prob_is_escalated():
+    # Neither clearly silence (the text is confident) nor confident speech (no_speech_prob is high)
+    assert run_cascade(gate_result("今日の天気は？", 0.85, -0.2)) == ("フルモデルの結果", 1)
+
+def test_unsure_text_with_high_no_speech_prob_is_kept_as_no_speech():
+    assert run_cascade(gate_result("ご視聴ありがとうございました", 0.85, -0.9)) == ("ご視聴ありがとうございました", 0)
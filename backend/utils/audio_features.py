@@ -0,0 +1,83 @@
+# backend/utils/audio_features.py
+
+import numpy as np
+
+_mel_cache = {}
+
+def frame_signal(samples, frame_length, hop_length):
+    """Splits a 1-D signal into overlapping frames (a strided view, no copy)."""
+    if samples.size < frame_length:
+        samples = np.pad(samples, (0, frame_length - samples.size))
+    n_frames = 1 + (samples.size - frame_length) // hop_length
+    stride = samples.strides[0]
+    return np.lib.stride_tricks.as_strided(
+        samples, shape=(n_frames, frame_length), strides=(hop_length * stride, stride), writeable=False
+    )
+
+def _mel_filterbank(sample_rate, n_fft, n_mels):
+    key = (sample_rate, n_fft, n_mels)
+    if key in _mel_cache:
+        return _mel_cache[key]
+
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    fbank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        for k in range(left, center):
+            fbank[m - 1, k] = (k - left) / max(center - left, 1)
+        for k in range(center, right):
+            fbank[m - 1, k] = (right - k) / max(right - center, 1)
+    _mel_cache[key] = fbank
+    return fbank
+
+def log_mel_spectrogram(samples, sample_rate, n_mels=26, frame_duration=0.025, hop_duration=0.010):
+    """Log mel band energies of a mono float32 signal. Returns (frames, n_mels)."""
+    frame_length = int(frame_duration * sample_rate)
+    hop_length = int(hop_duration * sample_rate)
+    n_fft = 1 << (frame_length - 1).bit_length()
+
+    frames = frame_signal(np.ascontiguousarray(samples, dtype=np.float32), frame_length, hop_length)
+    power = np.abs(np.fft.rfft(frames * np.hamming(frame_length), n=n_fft)) ** 2
+    mel_energy = power @ _mel_filterbank(sample_rate, n_fft, n_mels).T
+    return np.log(mel_energy + 1e-10)
+
+def mfcc(samples, sample_rate, n_mfcc=13, n_mels=26, frame_duration=0.025, hop_duration=0.010):
+    """
+    Computes MFCCs of a mono float32 signal. Returns (frames, n_mfcc).
+    Small and dependency-free; good enough for keyword template matching.
+    """
+    log_mel = log_mel_spectrogram(samples, sample_rate, n_mels, frame_duration, hop_duration)
+
+    # DCT-II as a matrix product
+    n = np.arange(n_mels)
+    dct = np.cos(np.pi / n_mels * (n + 0.5)[None, :] * np.arange(n_mfcc)[:, None])
+    return (log_mel @ dct.T).astype(np.float32)
+
+def dtw_distance(template, query, subsequence=False):
+    """
+    Dynamic time warping distance between two feature sequences, normalized
+    per template frame. With subsequence=True the template may match any
+    stretch of the query (free start and end).
+    """
+    cost = np.linalg.norm(template[:, None, :] - query[None, :, :], axis=2)
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    if subsequence:
+        acc[0, :] = 0.0
+    for i in range(1, n + 1):
+        row = cost[i - 1]
+        prev = acc[i - 1]
+        current = acc[i]
+        for j in range(1, m + 1):
+            current[j] = row[j - 1] + min(prev[j], current[j - 1], prev[j - 1])
+    if subsequence:
+        return float(acc[n, 1:].min() / n)
+    return float(acc[n, m] / n)
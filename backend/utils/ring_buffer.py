@@ -0,0 +1,74 @@
+# backend/utils/ring_buffer.py
+
+import numpy as np
+
+class RingBuffer:
+    """
+    Fixed-size, preallocated circular buffer for audio samples.
+    Positions are absolute sample counts since the buffer was created, so a
+    consumer can remember "where speech started" and carve it out later.
+    """
+    def __init__(self, capacity, channels=1, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.channels = channels
+        self.buffer = np.zeros((self.capacity, channels), dtype=dtype)
+        # Total number of samples ever written. Only the writer (the audio
+        # callback) updates it, and only after the samples are in place.
+        self.write_pos = 0
+
+    def write(self, block):
+        """Copies a (frames, channels) block into the buffer."""
+        n = len(block)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest samples can be kept
+            self.write_pos += n - self.capacity
+            self.write(block[-self.capacity:])
+            return
+
+        start = self.write_pos % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self.buffer[start:end] = block
+        else:
+            first = self.capacity - start
+            self.buffer[start:] = block[:first]
+            self.buffer[:n - first] = block[first:]
+        self.write_pos += n
+
+    def oldest_pos(self):
+        """Returns the oldest absolute position still held in the buffer."""
+        return max(0, self.write_pos - self.capacity)
+
+    def read(self, start_pos, end_pos=None):
+        """
+        Returns a copy of the samples in [start_pos, end_pos).
+        The range is clamped to what is still available in the buffer.
+        """
+        if end_pos is None:
+            end_pos = self.write_pos
+        start_pos = max(start_pos, self.oldest_pos())
+        end_pos = min(end_pos, self.write_pos)
+        if end_pos <= start_pos:
+            return np.zeros((0, self.channels), dtype=self.buffer.dtype)
+
+        out = np.empty((end_pos - start_pos, self.channels), dtype=self.buffer.dtype)
+        self.read_into(out, start_pos, end_pos)
+        return out
+
+    def read_into(self, out, start_pos, end_pos):
+        """
+        Copies the samples in [start_pos, end_pos) into the front of `out`
+        without allocating. The caller is responsible for clamping the range.
+        """
+        n = end_pos - start_pos
+        start = start_pos % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            out[:n] = self.buffer[start:end]
+        else:
+            first = self.capacity - start
+            out[:first] = self.buffer[start:]
+            out[first:n] = self.buffer[:n - first]
+        return n
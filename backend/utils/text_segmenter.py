@@ -0,0 +1,75 @@
+# backend/utils/text_segmenter.py
+
+import re
+
+# A sentence ends after 。！？!? (plus any closing brackets/quotes) or at a newline
+_SENTENCE_END = re.compile(r"[^。！？!?\n]*(?:[。！？!?]+[」』）)]*|\n+)")
+
+def split_sentences(text, min_length=4):
+    """
+    Splits Japanese text into sentences for synthesis.
+    Fragments shorter than `min_length` characters (e.g. 「え！」) are merged
+    into the following sentence, so VOICEVOX is not called for a single word.
+    """
+    sentences = []
+    pending = ""
+    position = 0
+    for match in _SENTENCE_END.finditer(text):
+        if not match.group():
+            continue
+        position = match.end()
+        pending += match.group()
+        if len(pending.strip()) >= min_length:
+            sentences.append(pending.strip())
+            pending = ""
+    pending += text[position:]
+    if pending.strip():
+        if sentences and len(pending.strip()) < min_length:
+            sentences[-1] += pending.strip()
+        else:
+            sentences.append(pending.strip())
+    return sentences
+
+class SentenceAssembler:
+    """
+    Incremental split_sentences for text that arrives in pieces (e.g. LLM
+    token deltas). `feed` returns the sentences completed by the new piece;
+    a sentence counts as complete once something follows its terminator,
+    so trailing 」 or a second ！ that arrive in the next delta stay
+    attached. `flush` returns whatever is left at the end of the stream
+    (a short tail becomes its own sentence rather than being merged back).
+    """
+    def __init__(self, min_length=4):
+        self.min_length = min_length
+        self.buffer = ""
+        self.pending = "" # Complete but too-short fragments, merged into the next sentence
+
+    def feed(self, delta):
+        self.buffer += delta
+        sentences = []
+        position = 0
+        for match in _SENTENCE_END.finditer(self.buffer):
+            if not match.group():
+                continue
+            if match.end() == len(self.buffer) and not match.group().endswith("\n"):
+                break # The terminator may still continue in the next delta
+            position = match.end()
+            self.pending += match.group()
+            if len(self.pending.strip()) >= self.min_length:
+                sentences.append(self.pending.strip())
+                self.pending = ""
+        self.buffer = self.buffer[position:]
+        return sentences
+
+    def flush(self):
+        rest = (self.pending + self.buffer).strip()
+        self.pending = ""
+        self.buffer = ""
+        return [rest] if rest else []
+
+def iter_sentences(deltas, min_length=4):
+    """Yields complete sentences from an iterable of text pieces as soon as each one ends."""
+    assembler = SentenceAssembler(min_length)
+    for delta in deltas:
+        yield from assembler.feed(delta)
+    yield from assembler.flush()
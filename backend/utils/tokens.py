@@ -0,0 +1,9 @@
+# backend/utils/tokens.py
+
+def estimate_tokens(text):
+    """
+    Rough Gemini token count without an API call: about one token per
+    Japanese character and one per four ASCII characters.
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
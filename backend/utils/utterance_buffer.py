@@ -0,0 +1,53 @@
+# backend/utils/utterance_buffer.py
+
+import numpy as np
+
+def block_rms(block):
+    """RMS of an audio block without allocating a squared copy."""
+    samples = block.reshape(-1)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.dot(samples, samples) / samples.size))
+
+class UtteranceBuffer:
+    """
+    Preallocated recording buffer that the audio callback writes into directly.
+    The callback is the only writer; it bumps `length` after each block is in
+    place, so the consumer can read samples [0, length) without a lock.
+    """
+    def __init__(self, capacity, channels=1):
+        self.capacity = int(capacity)
+        self.buffer = np.zeros((self.capacity, channels), dtype=np.float32)
+        self.length = 0
+
+    def reset(self):
+        """Starts a new recording, reusing the same memory."""
+        self.length = 0
+
+    def is_full(self):
+        return self.length >= self.capacity
+
+    def fill_from_ring(self, ring_buffer, start_pos, end_pos):
+        """Seeds the recording with samples (e.g. the pre-roll) from a RingBuffer."""
+        start_pos = max(start_pos, ring_buffer.oldest_pos())
+        end_pos = min(end_pos, ring_buffer.write_pos, start_pos + self.capacity)
+        n = 0
+        if end_pos > start_pos:
+            n = ring_buffer.read_into(self.buffer, start_pos, end_pos)
+        self.length = n
+        return n
+
+    def append(self, block):
+        """Copies a block after the current end. Returns the number of samples kept."""
+        start = self.length
+        n = min(len(block), self.capacity - start)
+        if n > 0:
+            self.buffer[start:start + n] = block[:n]
+            self.length = start + n
+        return n
+
+    def view(self, start=0, end=None):
+        """Returns a view (no copy) of the recorded samples."""
+        if end is None:
+            end = self.length
+        return self.buffer[start:end]
@@ -0,0 +1,47 @@
+# backend/utils/warmup.py
+
+import threading
+import time
+from utils.logging_config import log_message
+
+class WarmUp:
+    """
+    Runs start-up warm-up stages, given as (name, function) pairs, each in
+    its own background thread, and logs when each one is ready (with how
+    long it took) and when all of them are. A failed stage only means the
+    first real call is slow, so it is logged and never stops the application.
+    """
+    def __init__(self, stages):
+        self.started = time.perf_counter()
+        self.stages = {name: threading.Event() for name, _ in stages} # Set once the stage has finished
+        self.failed = []
+        self._lock = threading.Lock()
+        self._remaining = len(self.stages)
+        for name, function in stages:
+            threading.Thread(target=self._run, args=(name, function), daemon=True).start()
+
+    def _run(self, name, function):
+        start = time.perf_counter()
+        try:
+            function()
+            log_message(f"Warm-up: {name} ready ({time.perf_counter() - start:.2f}s).")
+        except Exception as e:
+            log_message(f"Warm-up: {name} failed after {time.perf_counter() - start:.2f}s: {e}")
+            with self._lock:
+                self.failed.append(name)
+        self.stages[name].set()
+        with self._lock:
+            self._remaining -= 1
+            done = self._remaining == 0
+        if done:
+            log_message(f"Warm-up finished in {time.perf_counter() - self.started:.2f}s "
+                        f"({len(self.stages) - len(self.failed)}/{len(self.stages)} stages ready).")
+
+    def wait(self, timeout=None):
+        """Blocks until every stage has finished. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for ready in self.stages.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not ready.wait(remaining):
+                return False
+        return True
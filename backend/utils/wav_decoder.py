@@ -0,0 +1,65 @@
+# backend/utils/wav_decoder.py
+
+import struct
+from collections import namedtuple
+import numpy as np
+
+_PCM = 1
+_IEEE_FLOAT = 3
+_EXTENSIBLE = 0xFFFE
+
+# (format tag, bits per sample) -> NumPy dtype of one sample
+_SAMPLE_DTYPES = {
+    (_PCM, 8): np.dtype("u1"),
+    (_PCM, 16): np.dtype("<i2"),
+    (_PCM, 32): np.dtype("<i4"),
+    (_IEEE_FLOAT, 32): np.dtype("<f4"),
+}
+
+class PCMAudio(namedtuple("PCMAudio", ["samples", "sample_rate"])):
+    """Decoded audio: `samples` is a (frames, channels) array, as sounddevice expects."""
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+def decode_wav(data):
+    """
+    Decodes WAV bytes (e.g. a VOICEVOX /synthesis response) without a temp
+    file. The returned samples are a read-only view over `data`'s data
+    chunk, so no audio is copied; they keep the file's sample type (int16
+    for VOICEVOX). Raises ValueError for anything that is not PCM/float WAV.
+    """
+    view = memoryview(data)
+    if len(view) < 12 or view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file.")
+
+    fmt = None
+    position = 12
+    while position + 8 <= len(view):
+        chunk_id = bytes(view[position:position + 4])
+        chunk_size = struct.unpack_from("<I", view, position + 4)[0]
+        body = position + 8
+        if chunk_id == b"fmt ":
+            format_tag, channels, sample_rate = struct.unpack_from("<HHI", view, body)
+            bits = struct.unpack_from("<H", view, body + 14)[0]
+            if format_tag == _EXTENSIBLE:
+                # The real format is the first two bytes of the SubFormat GUID
+                format_tag = struct.unpack_from("<H", view, body + 24)[0]
+            fmt = (format_tag, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk.")
+            format_tag, channels, sample_rate, bits = fmt
+            dtype = _SAMPLE_DTYPES.get((format_tag, bits))
+            if dtype is None:
+                raise ValueError(f"Unsupported WAV format {format_tag} with {bits}-bit samples.")
+            # Streamed WAVs may leave the size at 0/0xFFFFFFFF; use what is there
+            end = len(view) if chunk_size in (0, 0xFFFFFFFF) else min(body + chunk_size, len(view))
+            frame_bytes = dtype.itemsize * channels
+            end -= (end - body) % frame_bytes
+            samples = np.frombuffer(view[body:end], dtype=dtype).reshape(-1, channels)
+            return PCMAudio(samples, sample_rate)
+        position = body + chunk_size + (chunk_size & 1) # Chunks are padded to even sizes
+    raise ValueError("WAV file has no data chunk.")